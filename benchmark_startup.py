@@ -0,0 +1,314 @@
+"""Measure how long the add-on takes to import and register.
+
+Run it in a headless Blender with Sverchok installed, passing the directory of
+the built add-on (eg. dist/ladybug_tools before it is zipped):
+
+    blender -b --factory-startup --python benchmark_startup.py -- dist/ladybug_tools
+
+or in plain Python, with bpy, Sverchok and the other Blender modules stubbed:
+
+    python benchmark_startup.py --stub dist/ladybug_tools
+
+The time of each registration phase, of importing and registering each node
+module, and an -X importtime style breakdown of the ladybug imports are
+printed and saved as JSON. Passing the JSON of a previous run as --baseline
+reports the phases and node modules which got slower, with exit status 1.
+"""
+import argparse
+import collections
+import importlib
+import importlib.abc
+import importlib.machinery
+import json
+import os
+import platform
+import sys
+import time
+import types
+
+STUBBED_MODULES = ('bpy', 'bpy_extras', 'bmesh', 'mathutils', 'gpu', 'bgl', 'blf',
+                   'nodeitems_utils', 'sverchok')
+REPORTED_IMPORTS = ('ladybug', 'ladybug_geometry', 'ladybug_comfort')
+
+
+class _StubType(type):
+    """Classes standing for anything of the stubbed modules."""
+
+    def __getattr__(cls, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return stub(name)
+
+    def __contains__(cls, item):
+        return False
+
+    def __iter__(cls):
+        return iter(())
+
+
+class _Stub(metaclass=_StubType):
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return stub(name)
+
+    def __call__(self, *args, **kwargs):
+        return _Stub()
+
+    def __contains__(self, item):
+        return False
+
+    def __iter__(self):
+        return iter(())
+
+
+def stub(name):
+    """Get a class that can be subclassed, called, and has any attribute."""
+    return _StubType(name, (_Stub,), {})
+
+
+class StubModule(types.ModuleType):
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        value = stub(name)
+        setattr(self, name, value)
+        return value
+
+
+class StubFinder(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    """Import StubModules for the Blender and Sverchok modules and their submodules."""
+
+    def find_spec(self, name, path, target=None):
+        if name.split('.')[0] not in STUBBED_MODULES:
+            return None
+        return importlib.machinery.ModuleSpec(name, self, is_package=True)
+
+    def create_module(self, spec):
+        module = StubModule(spec.name)
+        module.__path__ = []
+        return module
+
+    def exec_module(self, module):
+        pass
+
+
+class _TimedLoader(object):
+    """Proxy of a loader timing the execution of the modules it loads."""
+
+    def __init__(self, loader, timer):
+        self._loader = loader
+        self._timer = timer
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        stack = self._timer.stack
+        stack.append(0.0)  # time spent importing the modules imported by this one
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            cumulative = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += cumulative
+            self._timer.records.append((module.__name__, cumulative - children, cumulative, len(stack)))
+
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    """Record the self and cumulative time of each module imported, like -X importtime.
+
+    This works within a running Blender, where -X importtime can't be set.
+    """
+
+    def __init__(self):
+        self.records = []  # (module name, self, cumulative, depth) in the order imports end
+        self.stack = []
+
+    def find_spec(self, name, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+            spec.loader = _TimedLoader(spec.loader, self)
+        return spec
+
+    def cumulative(self, name):
+        for module_name, _, cumulative, _ in self.records:
+            if module_name == name:
+                return cumulative
+        return 0.0
+
+
+def timed(function, record):
+    """Wrap a function to pass the seconds taken by each of its calls to record."""
+    def timed_function(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            record(time.perf_counter() - start)
+    return timed_function
+
+
+def benchmark(addon_dir):
+    """Import, register and unregister the add-on, timing each step.
+
+    Args:
+        addon_dir: The directory of the add-on package.
+
+    Returns:
+        A dictionary of the results, in seconds.
+    """
+    parent, package = os.path.split(os.path.abspath(addon_dir).rstrip(os.sep))
+    sys.path.insert(0, parent)
+    timer = ImportTimer()
+    sys.meta_path.insert(0, timer)
+    phases = collections.OrderedDict()
+    node_modules = collections.OrderedDict()
+
+    def record_phase(name):
+        def record(seconds):
+            phases[name] = phases.get(name, 0.0) + seconds
+        return record
+
+    start = time.perf_counter()
+    addon = importlib.import_module(package)
+    phases['import'] = time.perf_counter() - start
+
+    for name in ('icons', 'sockets', 'cache', 'sticky', 'parallel', 'background', 'schedule', 'instrument'):
+        module = getattr(addon, name, None)
+        if isinstance(module, types.ModuleType):
+            module.register = timed(module.register, record_phase('register ' + name))
+    make_node_list = addon.make_node_list
+
+    def timed_make_node_list():
+        modules = make_node_list()
+        for module in modules:
+            name = module.__name__.rsplit('.', 1)[-1]
+            node_modules[name] = {'import': timer.cumulative(module.__name__), 'register': 0.0}
+
+            def record(seconds, name=name):
+                node_modules[name]['register'] += seconds
+            module.register = timed(module.register, record)
+        return modules
+    addon.make_node_list = timed_make_node_list
+    addon.register_nodes = timed(addon.register_nodes, record_phase('register nodes'))
+    addon.make_menu = timed(addon.make_menu, record_phase('menus'))
+
+    start = time.perf_counter()
+    addon.register()
+    phases['register'] = time.perf_counter() - start
+    start = time.perf_counter()
+    addon.unregister()
+    phases['unregister'] = time.perf_counter() - start
+    sys.meta_path.remove(timer)
+
+    imports = [{'module': name, 'self': self_time, 'cumulative': cumulative, 'depth': depth}
+               for name, self_time, cumulative, depth in timer.records
+               if name.split('.')[0] in REPORTED_IMPORTS + (package,)]
+    return {
+        'blender': blender_version(),
+        'python': platform.python_version(),
+        'phases': phases,
+        'node_modules': node_modules,
+        'imports': imports
+    }
+
+
+def blender_version():
+    bpy = sys.modules.get('bpy')
+    if bpy is None or isinstance(bpy, StubModule):
+        return None
+    return bpy.app.version_string
+
+
+def print_results(results):
+    print('Blender {}, Python {}'.format(results['blender'] or '(stubbed)', results['python']))
+    for name, seconds in results['phases'].items():
+        print('{:>10.1f} ms  {}'.format(seconds * 1000, name))
+    slowest = sorted(results['node_modules'].items(),
+                     key=lambda item: item[1]['import'] + item[1]['register'], reverse=True)
+    print('\nSlowest of {} node modules (import, register):'.format(len(slowest)))
+    for name, times in slowest[:10]:
+        print('{:>10.1f} ms {:>8.1f} ms  {}'.format(
+            times['import'] * 1000, times['register'] * 1000, name))
+    print('\nimport time: self [us] | cumulative | imported package')
+    for record in results['imports']:
+        print('import time: {:>9.0f} | {:>10.0f} | {}{}'.format(
+            record['self'] * 1e6, record['cumulative'] * 1e6,
+            '  ' * record['depth'], record['module']))
+
+
+def compare(results, baseline, tolerance=0.2, minimum=0.005):
+    """Get the phases and node modules slower than in the baseline.
+
+    Args:
+        results: The results of benchmark.
+        baseline: The results of a previous benchmark.
+        tolerance: The fraction by which a time may grow before it is reported.
+        minimum: The number of seconds by which a time must grow to be reported.
+
+    Returns:
+        A list of (name, baseline seconds, seconds) tuples.
+    """
+    times, baseline_times = {}, {}
+    for source, target in ((results, times), (baseline, baseline_times)):
+        target.update(source['phases'])
+        for name, module_times in source['node_modules'].items():
+            target['node ' + name] = module_times['import'] + module_times['register']
+    regressions = []
+    for name, seconds in times.items():
+        before = baseline_times.get(name)
+        if before is not None and seconds > before * (1 + tolerance) and seconds - before > minimum:
+            regressions.append((name, before, seconds))
+    return regressions
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Measure the startup time of the add-on.')
+    parser.add_argument('addon_dir', help='directory of the add-on package')
+    parser.add_argument('--stub', action='store_true',
+                        help='stub bpy, Sverchok and the other Blender modules')
+    parser.add_argument('--output', default='startup_benchmark.json',
+                        help='JSON file to save the results to')
+    parser.add_argument('--baseline', help='JSON file of a previous run to compare with')
+    args = parser.parse_args(argv)
+
+    if args.stub:
+        sys.meta_path.insert(0, StubFinder())
+    results = benchmark(args.addon_dir)
+    print_results(results)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=4)
+    print('\nSaved to {}'.format(args.output))
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare(results, json.load(f))
+        for name, before, seconds in regressions:
+            print('SLOWER: {} {:.1f} ms -> {:.1f} ms'.format(name, before * 1000, seconds * 1000))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    # Blender passes the arguments of the script after --
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+    sys.exit(main(argv))
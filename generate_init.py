@@ -1,11 +1,16 @@
 import os
+import sys
 import json
 import pystache
 import subprocess
 from pathlib import Path
 
+# Module of all generated nodes with --bundle, which must match generate_nodes.py
+BUNDLE_MODULE = 'LB_Nodes'
+
 class Generator():
-    def __init__(self):
+    def __init__(self, bundle=False):
+        self.bundle = bundle
         self.json_dir = './dist/working/json/'
         self.out_dir = './dist/working/python/'
 
@@ -25,7 +30,7 @@ class Generator():
                 spec['nickname'] = spec['nickname'].replace('+', 'Plus')
                 filename = os.path.basename(filename)
                 data['nodes'].append({
-                    'node_module': filename[0:-5],
+                    'node_module': BUNDLE_MODULE if self.bundle else filename[0:-5],
                     'node_classname': spec['nickname']
                 })
                 subcategory = spec['subcategory'].split(' :: ')[1]
@@ -42,5 +47,5 @@ class Generator():
             with open('init.mustache', 'r') as template:
                 f.write(pystache.render(template.read(), data))
 
-generator = Generator()
+generator = Generator(bundle='--bundle' in sys.argv)
 generator.generate()
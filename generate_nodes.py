@@ -1,25 +1,89 @@
 import os
+import sys
 import json
 import pystache
 import subprocess
 from pathlib import Path
+from node_code import guard_unlinked_outputs, mutated_inputs, split_imports, uses_blender
+
+# Module of all generated nodes with --bundle, which generate_init.py must match
+BUNDLE_MODULE = 'LB_Nodes'
+
+# Run by Blender's Python, as a .pyc is only used by the Python version which wrote it
+COMPILE_SCRIPT = '''
+import py_compile, sys
+for path in sys.argv[1:]:
+    try:
+        # Checked against the source hash, since installing the zip resets timestamps
+        py_compile.compile(path, doraise=True,
+                           invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH)
+    except py_compile.PyCompileError as e:
+        print(e.msg, file=sys.stderr)
+        print(path)
+'''
 
 class Generator():
-    def __init__(self):
+    def __init__(self, bundle=False):
+        self.bundle = bundle
         self.json_dir = './dist/working/json/'
         self.icon_dir = './dist/working/icon/'
+        self.source_icon_dir = './ladybug_tools/icons/'
         self.python2to3_bin = '/usr/bin/2to3'
+        # Blender's Python, eg. /opt/blender/3.6/python/bin/python3.10
+        self.blender_python = os.environ.get('BLENDER_PYTHON')
+        self.module_paths = []
         #self.out_dir = './nodes/ladybug/'
         self.out_dir = './dist/working/python/'
+        self.casts = {'bool': 'cast_bool', 'int': 'cast_int', 'double': 'cast_double'}
 
     def generate(self):
-        for filename in Path(self.json_dir).glob('*.json'):
+        specs = []
+        for filename in sorted(Path(self.json_dir).glob('*.json')):
             if 'LB_Export_UserObject' in str(filename) \
                     or 'LB_Sync_Grasshopper_File' in str(filename) \
                     or 'LB_Versioner' in str(filename):
                 continue # I think these nodes are just for Grasshopper
             with open(filename, 'r') as spec_f:
-                self.generate_node(os.path.basename(filename), json.load(spec_f))
+                specs.append(self.generate_node(os.path.basename(filename), json.load(spec_f)))
+        if self.bundle:
+            self.write_module(BUNDLE_MODULE, 'node_bundle.mustache', {'nodes': specs})
+        self.compile_modules()
+        self.generate_icon_manifest()
+
+    def write_module(self, module_name, template_name, context):
+        out_filepath = os.path.join(self.out_dir, module_name + '.py')
+        with open(out_filepath, 'w') as f:
+            with open(template_name, 'r') as template:
+                f.write(pystache.render(template.read(), context))
+        subprocess.run([self.python2to3_bin, '-x', 'itertools_imports', '-w', out_filepath])
+        self.module_paths.append(out_filepath)
+
+    def compile_modules(self):
+        # Byte-compile the generated modules, which is skipped if Blender's Python isn't given
+        if not self.blender_python:
+            print('BLENDER_PYTHON is not set, the generated nodes are not byte-compiled')
+            return
+        try:
+            result = subprocess.run([self.blender_python, '-c', COMPILE_SCRIPT] + self.module_paths,
+                                    stdout=subprocess.PIPE, universal_newlines=True)
+        except OSError as e:
+            print('Could not run {} to byte-compile the generated nodes: {}'.format(self.blender_python, e))
+            return
+        failed = result.stdout.splitlines()
+        if failed:
+            print('{} generated modules could not be byte-compiled: {}'.format(len(failed), ', '.join(failed)))
+
+    def generate_icon_manifest(self):
+        # Lets the add-on find its icons without listing the icons directory
+        icon_paths = list(Path(self.icon_dir).glob('lb_*.png')) + list(Path(self.source_icon_dir).glob('lb_*.png'))
+        manifest = {path.stem.upper(): path.name for path in sorted(icon_paths)}
+        with open(os.path.join(self.icon_dir, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=4, sort_keys=True)
+
+    def tuple_literal(self, items):
+        if len(items) == 1:
+            return '({},)'.format(items[0])
+        return '({})'.format(', '.join(items))
 
     def generate_node(self, filename, spec):
         code_data = {
@@ -33,20 +97,48 @@ class Generator():
         #    'grasshopper': '{{plugin}}', 'Grasshopper': '{{Plugin}}',
         #    'GH': '{{PLGN}}', 'Food4Rhino': '{{Package_Manager}}',
         #    'rhino': '{{cad}}', 'Rhino': '{{Cad}}'
-        spec['code'] = pystache.render(spec['code'].replace('\n', '\n' + ' '*8), code_data)
         spec['outputs'] = spec['outputs'][0] # JSON double nests this, maybe a mistake?
-        spec['input_name_list'] = ', '.join(["'{}'".format(i['name']) for i in spec['inputs']])
+        code = pystache.render(spec['code'], code_data)
+        # Nodes converting Blender geometry can't run in a background thread
+        spec['uses_blender'] = 'True' if uses_blender(code) else 'False'
+        # Whole list inputs are only copied for each run if the code may change them
+        mutated_names = mutated_inputs(code, [i['name'] for i in spec['inputs']])
+        spec['input_mutated_list'] = self.tuple_literal([str(i['name'] in mutated_names) for i in spec['inputs']])
+        # Import the modules of the component once, when the node first runs
+        reserved_names = [i['name'] for i in spec['inputs']] + [o['name'] for o in spec['outputs']]
+        imports, imported_names, code = split_imports(code, reserved_names + ['self', 'sv_linked'])
+        spec['has_imports'] = bool(imports)
+        spec['imports_code'] = ' '*4 + imports.replace('\n', '\n' + ' '*4)
+        spec['imported_names'] = self.tuple_literal(imported_names)
+        # Skip the computations of outputs which are not linked
+        code = guard_unlinked_outputs(code, [o['name'] for o in spec['outputs']], module_names=imported_names)
+        spec['code'] = code.replace('\n', '\n' + ' '*8)
+        spec['input_name_list'] = self.tuple_literal(["'{}'".format(i['name']) for i in spec['inputs']])
         spec['input_name_unquoted_list'] = ', '.join([i['name'] for i in spec['inputs']])
-        spec['input_type_list'] = ', '.join(["'{}'".format(i['type']) for i in spec['inputs']])
-        spec['input_default_list'] = [repr(i['default']) for i in spec['inputs']]
+        input_defaults = [repr(i['default']) for i in spec['inputs']]
 
         # These two lines are because the JSON dosen't properly represent bools
-        spec['input_default_list'] = ['True' if i == "'true'" else i for i in spec['input_default_list']]
-        spec['input_default_list'] = ['False' if i == "'false'" else i for i in spec['input_default_list']]
+        input_defaults = ['True' if i == "'true'" else i for i in input_defaults]
+        input_defaults = ['False' if i == "'false'" else i for i in input_defaults]
 
-        spec['input_default_list'] = ', '.join(spec['input_default_list'])
-        spec['input_access_list'] = ', '.join(["'{}'".format(i['access']) for i in spec['inputs']])
-        spec['output_name_list'] = ', '.join(["'{}'".format(o['name']) for o in spec['outputs']])
+        # Resolve each input's converter here so the node never compares type names
+        spec['input_cast_list'] = self.tuple_literal(['{}({}, {})'.format(
+            'list_caster' if i['access'] == 'list' else 'item_caster',
+            self.casts.get(i['type'], 'None'), default) for i, default in zip(spec['inputs'], input_defaults)])
+        spec['input_list_access'] = self.tuple_literal([str(i['access'] == 'list') for i in spec['inputs']])
+        spec['has_list_inputs'] = any(i['access'] == 'list' for i in spec['inputs'])
+        spec['output_name_list'] = self.tuple_literal(["'{}'".format(o['name']) for o in spec['outputs']])
+        # process_ladybug returns its output values, which are UNSET until assigned,
+        # and process_items collects them into lists named after each output
+        output_names = [o['name'] for o in spec['outputs']]
+        input_names = [i['name'] for i in spec['inputs']]
+        unset_names = [name for name in output_names if name not in input_names]
+        spec['output_unset'] = ' = '.join(unset_names + ['UNSET']) if unset_names else 'pass'
+        spec['output_return_list'] = self.tuple_literal(output_names)
+        for i, item in enumerate(spec['outputs']):
+            item['value_name'] = 'sv_value_{}'.format(i)
+        spec['output_value_list'] = self.tuple_literal([o['value_name'] for o in spec['outputs']])
+        spec['output_accumulator_list'] = self.tuple_literal(['{}_out'.format(name) for name in output_names])
         spec['nickname'] = spec['nickname'].replace('+', 'Plus').replace(" ", "_")
         spec['nickname_uppercase'] = spec['nickname'].upper()
         spec['description'] = spec['description'].replace('\n', ' ').replace("'", "\\'")
@@ -55,17 +147,15 @@ class Generator():
         for item in spec['outputs']:
             item['description'] = item['description'].replace('\n', ' ').replace("'", "\\'")
         module_name = filename[0:-5]
-        out_filepath = os.path.join(self.out_dir, module_name + '.py')
-        with open(out_filepath, 'w') as f:
-            with open('generic_node.mustache', 'r') as template:
-                f.write(pystache.render(template.read(), spec))
-        subprocess.run([self.python2to3_bin, '-x', 'itertools_imports', '-w', out_filepath])
+        if not self.bundle:
+            self.write_module(module_name, 'generic_node.mustache', spec)
         icon_path = os.path.join(self.icon_dir, 'lb_{}.png'.format(spec['nickname'].lower()))
         os.rename(
             os.path.join(self.icon_dir, '{}.png'.format(module_name.replace('_', ' '))),
             icon_path)
         # This incantation reverts the intensity channel in HSI. It will make light colors darker, and dark colors lighter
         subprocess.run(['convert', icon_path, '-colorspace', 'HSI', '-channel', 'B', '-level', '100,0%', '+channel', '-colorspace', 'sRGB', icon_path])
+        return spec
 
-generator = Generator()
+generator = Generator(bundle='--bundle' in sys.argv)
 generator.generate()
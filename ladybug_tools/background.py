@@ -0,0 +1,193 @@
+"""Run the items of long generated nodes in a background thread.
+
+Only process_ladybug runs in the thread, against a stand-in for the node, so
+the node itself is only touched from Blender's main thread. Nodes whose code
+converts Blender geometry (eg. with ladybug_tools.togeometry or intersect)
+have sv_uses_blender set by the generator, and never run in the background.
+A timer polls the running jobs and re-evaluates a node once its job has
+finished.
+"""
+import bpy
+import threading
+import traceback
+from bpy.props import StringProperty
+from sverchok.data_structure import updateNode
+
+from .cache import stable_hash
+from .helper import collect_outputs
+from .parallel import StandInNode
+from .progress import Cancelled, Progress, track_progress
+
+POLL_INTERVAL = 0.2  # seconds
+
+_jobs = {}  # (node tree name, node name): BackgroundJob
+
+
+class BackgroundJob(object):
+    """The items of a node being processed in a thread.
+
+    Args:
+        function: The process_ladybug function of the node class.
+        output_names: A tuple of the names of the node outputs.
+        linked_outputs: A frozenset of the names of the linked outputs.
+        items: A list with the list of converted inputs of each item.
+    """
+
+    def __init__(self, function, output_names, linked_outputs, items):
+        self.function = function
+        self.progress = Progress(len(items))
+        self.error = None
+        self.finished = False
+        self.notified = False
+        self._items = items
+        self.items_hash = stable_hash(items)
+        self._results = []
+        self._node = StandInNode(output_names, linked_outputs)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def outputs(self):
+        """A tuple with a list of the values of each output of the processed items."""
+        return collect_outputs(len(self._node.sv_output_names), self._results)
+
+    def start(self):
+        self._thread.start()
+
+    @property
+    def cancelled(self):
+        return self.progress.cancelled
+
+    def cancel(self):
+        """Stop the job at the next check of its progress, even within an item."""
+        self.progress.cancel()
+
+    def processed(self, items):
+        """Check that the job processed these items.
+
+        Items which can't be pickled are assumed to be the same, as they can't be
+        compared without re-running jobs forever.
+        """
+        return self.items_hash is None or self.items_hash == stable_hash(items)
+
+    def _run(self):
+        try:
+            with track_progress(self.progress) as progress:
+                progress.check()
+                for args in self._items:
+                    self._results.append(self.function(self._node, *args))
+                    progress.advance()
+        except Cancelled:
+            pass
+        except Exception as e:
+            e.ladybug_traceback = traceback.format_exc()
+            self.error = e
+        finally:
+            self.finished = True
+
+
+def node_key(node):
+    return (node.id_data.name, node.name)
+
+
+def node_job(node):
+    """Get the background job of a node, or None if it has none."""
+    return _jobs.get(node_key(node))
+
+
+def process_in_background(node, items):
+    """Process the items of a node in a thread, or get the outputs once finished.
+
+    A new job replaces any job still running for the node, since its inputs
+    have changed since it started, and any finished job of other items.
+
+    Args:
+        node: A generated Ladybug node.
+        items: A list with the list of converted inputs of each item.
+
+    Returns:
+        A tuple with a list of the values of each output once the job has
+        finished. None if a job was started, in which case the node is
+        processed again once the job finishes.
+    """
+    key = node_key(node)
+    job = _jobs.get(key)
+    if job is not None and job.finished and not job.cancelled and job.processed(items):
+        del _jobs[key]
+        if job.error is not None:
+            print(job.error.ladybug_traceback)
+            raise job.error
+        return job.outputs
+    if job is not None:
+        job.cancel()
+    job = _jobs[key] = BackgroundJob(
+        type(node).process_ladybug, node.sv_output_names, node.sv_linked_outputs, items)
+    job.start()
+    if not bpy.app.timers.is_registered(poll_jobs):
+        bpy.app.timers.register(poll_jobs, first_interval=POLL_INTERVAL)
+    return None
+
+
+def cancel_job(node):
+    job = _jobs.pop(node_key(node), None)
+    if job is not None:
+        job.cancel()
+
+
+def poll_jobs():
+    """Re-evaluate the nodes of finished jobs and redraw the progress of the others."""
+    for key, job in list(_jobs.items()):
+        if not job.finished or job.notified:
+            continue
+        job.notified = True
+        tree = bpy.data.node_groups.get(key[0])
+        node = tree.nodes.get(key[1]) if tree else None
+        if node is None:
+            del _jobs[key]
+        else:
+            updateNode(node, bpy.context)
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'NODE_EDITOR':
+                area.tag_redraw()
+    if any(not job.notified for job in _jobs.values()):
+        return POLL_INTERVAL
+    return None
+
+
+def draw_job(node, layout):
+    """Draw the progress of the background job of a node with a cancel button."""
+    job = node_job(node)
+    if job is None or job.finished:
+        return
+    row = layout.row(align=True)
+    row.label(text='Running {}/{}'.format(job.progress.done, job.progress.total), icon='TIME')
+    op = row.operator('node.sv_lb_cancel_background', text='', icon='CANCEL')
+    op.idtree = node.id_data.name
+    op.idname = node.name
+
+
+class SvLBCancelBackground(bpy.types.Operator):
+    bl_idname = "node.sv_lb_cancel_background"
+    bl_label = "Cancel"
+    bl_description = "Stop processing this node in the background"
+
+    idtree: StringProperty(default='')
+    idname: StringProperty(default='')
+
+    def execute(self, context):
+        node = bpy.data.node_groups[self.idtree].nodes[self.idname]
+        cancel_job(node)
+        return {'FINISHED'}
+
+
+def register():
+    bpy.utils.register_class(SvLBCancelBackground)
+
+
+def unregister():
+    for job in _jobs.values():
+        job.cancel()
+    _jobs.clear()
+    if bpy.app.timers.is_registered(poll_jobs):
+        bpy.app.timers.unregister(poll_jobs)
+    bpy.utils.unregister_class(SvLBCancelBackground)
@@ -0,0 +1,157 @@
+"""Caches to reuse the results of expensive Ladybug node evaluations."""
+import bpy
+import collections
+import hashlib
+import pickle
+from bpy.props import StringProperty
+
+from .helper import collect_outputs
+from .progress import iter_progress
+
+
+class LRUCache(object):
+    """A least recently used cache limited by the total size of its entries.
+
+    Args:
+        budget: An integer for the maximum number of bytes held by the cache.
+    """
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()  # key: (value, size)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """Get a value from the cache, marking it as the most recently used."""
+        try:
+            value = self._entries[key][0]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value, size):
+        """Add a value, evicting the least recently used ones past the budget.
+
+        Returns:
+            True if the value was stored. False if it is larger than the budget.
+        """
+        self.discard(key)
+        if size > self.budget:
+            return False
+        self._entries[key] = (value, size)
+        self.size += size
+        self.evict()
+        return True
+
+    def evict(self):
+        """Remove the least recently used values until the cache fits its budget."""
+        while self.size > self.budget:
+            self.size -= self._entries.popitem(last=False)[1][1]
+
+    def discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+
+def stable_hash(values):
+    """Get a digest of pickled values, or None if they can't be pickled."""
+    try:
+        data = pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return None
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class NodeMemo(LRUCache):
+    """Results of a generated node's process_ladybug, keyed by its inputs."""
+
+    def lookup(self, node, args):
+        """Get the key of the inputs args and their cached outputs, or None if not cached."""
+        # Unlinked outputs are not computed, so they are part of the key
+        key = stable_hash((node.sv_linked_outputs, args))
+        return key, None if key is None else self.get(key)
+
+    def store(self, key, outputs):
+        if key is None:
+            return
+        try:
+            size = len(pickle.dumps(outputs, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            return  # outputs that can't be pickled are not cached
+        self.put(key, outputs, size)
+
+    def process(self, node, args):
+        """Get the output values of node.process_ladybug(*args), running it unless cached."""
+        key, outputs = self.lookup(node, args)
+        if outputs is None:
+            outputs = node.process_ladybug(*args)
+            self.store(key, outputs)
+        return outputs
+
+    def process_items(self, node, items):
+        """Get a list of the values of each output for a list of items of inputs."""
+        return collect_outputs(len(node.sv_output_names),
+                               (self.process(node, args) for args in iter_progress(items)))
+
+
+_node_memos = {}
+
+
+def node_memo(node, budget):
+    """Get the memo of a node, creating it if needed.
+
+    Args:
+        node: A Sverchok node.
+        budget: An integer for the memory budget of the memo in bytes.
+    """
+    memo = _node_memos.get(node.node_id)
+    if memo is None:
+        memo = _node_memos[node.node_id] = NodeMemo(budget)
+    elif memo.budget != budget:
+        memo.budget = budget
+        memo.evict()
+    return memo
+
+
+def discard_node_memo(node):
+    """Forget all results cached for a node."""
+    _node_memos.pop(node.node_id, None)
+
+
+class SvLBClearMemo(bpy.types.Operator):
+    bl_idname = "node.sv_lb_clear_memo"
+    bl_label = "Clear Cache"
+    bl_description = "Forget the results cached by this node"
+
+    idtree: StringProperty(default='')
+    idname: StringProperty(default='')
+
+    def execute(self, context):
+        node = bpy.data.node_groups[self.idtree].nodes[self.idname]
+        discard_node_memo(node)
+        return {'FINISHED'}
+
+
+def register():
+    bpy.utils.register_class(SvLBClearMemo)
+
+
+def unregister():
+    _node_memos.clear()
+    bpy.utils.unregister_class(SvLBClearMemo)
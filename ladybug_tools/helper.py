@@ -3,3 +3,146 @@ class Ghenv():
 
 ghenv = Ghenv()
 ghenv.Component = None
+
+
+def cast_bool(value):
+    """Convert a Sverchok input value to a boolean."""
+    if value is None:
+        return False
+    elif value == 'True' or value == '1':
+        return True
+    elif value == 'False' or value == '0':
+        return False
+    return bool(value)
+
+
+def cast_int(value):
+    """Convert a Sverchok input value to an integer."""
+    return None if value is None else int(value)
+
+
+def cast_double(value):
+    """Convert a Sverchok input value to a float."""
+    return None if value is None else float(value)
+
+
+def item_caster(cast, default):
+    """Get a function converting one input value, using default for empty strings.
+
+    Args:
+        cast: One of the cast_* functions, or None to keep the value as it is.
+        default: The value used when the input is an empty string.
+    """
+    if cast is None:
+        def cast_item(value):
+            return default if isinstance(value, str) and value == '' else value
+    else:
+        def cast_item(value):
+            return cast(default if isinstance(value, str) and value == '' else value)
+    return cast_item
+
+
+def list_caster(cast, default):
+    """Get a function converting a list input, where a single None becomes an empty list.
+
+    Args:
+        cast: One of the cast_* functions, or None to keep the values as they are.
+        default: The value used when an item is an empty string.
+    """
+    cast_item = item_caster(cast, default)
+
+    def cast_list(value):
+        values = value if isinstance(value, (list, tuple)) else (value,)
+        result = [cast_item(v) for v in values]
+        if len(result) == 1 and result[0] is None:
+            return []
+        return result
+    cast_list.cast = cast
+    return cast_list
+
+
+NUMERIC_CASTS = {cast_bool: bool, cast_int: int, cast_double: float, None: None}
+
+
+def cast_whole_list(cast_list, values):
+    """Convert the values of a list input at once, with NumPy if they are numbers.
+
+    Args:
+        cast_list: A function made by list_caster.
+        values: The list of values of the input.
+    """
+    from .sverchok import numeric_array  # loads NumPy, so not when the add-on starts
+    array = numeric_array(values)
+    if array is None or array.ndim != 1 or cast_list.cast not in NUMERIC_CASTS:
+        return cast_list(values)
+    dtype = NUMERIC_CASTS[cast_list.cast]
+    return (array if dtype is None else array.astype(dtype)).tolist()
+
+
+def whole_list_items(sv_input_nested, casts, list_access, mutated):
+    """Get the items of one group of node inputs, with Grasshopper's list access.
+
+    Each input with list access gets its whole list in every item, instead of
+    one value of it. The values of the other inputs are matched with
+    longest-list logic, giving one item per value of the longest of them.
+
+    Args:
+        sv_input_nested: A list with the values of each input in the group.
+        casts: The functions converting each input, made by item_caster or
+            list_caster.
+        list_access: A tuple of booleans, True for the inputs with list access.
+        mutated: A tuple of booleans, True for the inputs which the node may
+            change in place. Each item gets its own copy of their lists, while
+            the lists of the other inputs are shared by all the items.
+
+    Returns:
+        A list with the converted input values of each item.
+    """
+    import numpy as np
+    from .sverchok import match_longest_list
+    lists = [cast_whole_list(cast, values) if is_list else None
+             for cast, values, is_list in zip(casts, sv_input_nested, list_access)]
+    item_inputs = [i for i, is_list in enumerate(list_access) if not is_list]
+    if any(len(sv_input_nested[i]) == 0 for i in item_inputs):
+        return []
+    # match the indices rather than the values, which keeps them as they are
+    indices = match_longest_list(*[np.arange(len(sv_input_nested[i])) for i in item_inputs])
+    count = len(indices[0]) if indices else 1
+    copied = [values is not None and is_mutated for values, is_mutated in zip(lists, mutated)]
+    items = []
+    for k in range(count):
+        last = k == count - 1  # which can have the lists themselves
+        item = [list(values) if copy and not last else values
+                for values, copy in zip(lists, copied)]
+        for i, input_indices in zip(item_inputs, indices):
+            item[i] = casts[i](sv_input_nested[i][input_indices[k]])
+        items.append(item)
+    return items
+
+
+class Unset(object):
+    """Type of UNSET, the value of node outputs that an item did not assign."""
+
+    def __repr__(self):
+        return 'UNSET'
+
+    def __reduce__(self):
+        return 'UNSET'  # unpickle as this module's UNSET, so `is UNSET` still works
+
+
+UNSET = Unset()
+
+
+def collect_outputs(output_count, items_outputs):
+    """Gather the values returned by process_ladybug for each item into one list per output.
+
+    Args:
+        output_count: An integer for the number of node outputs.
+        items_outputs: An iterable with the tuple of output values of each item.
+    """
+    outputs = tuple([] for _ in range(output_count))
+    for item_outputs in items_outputs:
+        for values, value in zip(outputs, item_outputs):
+            if value is not UNSET:
+                values.append([value])
+    return outputs
@@ -1,22 +1,38 @@
 import os
 import glob
+import json
 
 from sverchok.ui.sv_icons import register_custom_icon_provider
 
+ICONS_DIR = os.path.join(os.path.dirname(__file__), "icons")
+MANIFEST = "manifest.json"
+
+_manifest = None
+
+def icon_manifest():
+    """Get the file name of each icon id, from the manifest written by generate_nodes.py.
+
+    Without a manifest (eg. when running from a checkout) the icons directory
+    is globbed instead. Either way this is only done once.
+    """
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(os.path.join(ICONS_DIR, MANIFEST), 'r') as f:
+                _manifest = json.load(f)
+        except (IOError, ValueError):
+            icon_files = [os.path.basename(x) for x in glob.glob(os.path.join(ICONS_DIR, "lb_*.png"))]
+            _manifest = {os.path.splitext(x)[0].upper(): x for x in icon_files}
+    return _manifest
+
 class SvExIconProvider(object):
     def __init__(self):
         pass
 
     def get_icons(self):
-        icons_dir = os.path.join(os.path.dirname(__file__), "icons")
-        icon_pattern = "lb_*.png"
-        icon_path = os.path.join(icons_dir, icon_pattern)
-        icon_files = [os.path.basename(x) for x in glob.glob(icon_path)]
-
-        for icon_file in icon_files:
-            icon_name = os.path.splitext(icon_file)[0]
-            icon_id = icon_name.upper()
-            yield icon_id, os.path.join(icons_dir, icon_file)
+        # Blender previews defer reading an image until its icon is drawn
+        for icon_id, icon_file in icon_manifest().items():
+            yield icon_id, os.path.join(ICONS_DIR, icon_file)
 
 def register():
     register_custom_icon_provider("ladybug", SvExIconProvider())
@@ -0,0 +1,183 @@
+"""Performance statistics of Ladybug node evaluations."""
+import bpy
+import json
+import threading
+import time
+import tracemalloc
+from bpy.props import BoolProperty, StringProperty
+from bpy_extras.io_utils import ExportHelper
+
+COUNTERS = ('wall_time', 'items', 'rays', 'cache_hits', 'peak_memory')
+
+_stats = {}  # (node tree name, node name): NodeStats
+_local = threading.local()  # active: the evaluations measured in a thread, innermost last
+
+
+class Evaluation(object):
+    """The measurements of one evaluation of a node."""
+
+    __slots__ = COUNTERS + ('node_key',)
+
+    def __init__(self, node_key=None):
+        self.node_key = node_key
+        for name in COUNTERS:
+            setattr(self, name, 0)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in COUNTERS}
+
+
+class NodeStats(object):
+    """The last evaluation of a node and the totals of all its evaluations."""
+
+    def __init__(self, node_type):
+        self.node_type = node_type
+        self.runs = 0
+        self.last = None
+        self.totals = dict.fromkeys(COUNTERS, 0)
+
+    def add(self, evaluation):
+        self.runs += 1
+        self.last = evaluation
+        for name in COUNTERS:
+            self.totals[name] += getattr(evaluation, name)
+
+    def average(self, name):
+        return self.totals[name] / self.runs if self.runs else 0
+
+    def to_dict(self):
+        return {
+            'node_type': self.node_type,
+            'runs': self.runs,
+            'last': self.last.to_dict() if self.last else None,
+            'average': {name: self.average(name) for name in COUNTERS}
+        }
+
+
+class measure(object):
+    """Context manager measuring an evaluation of a node.
+
+    The yielded Evaluation has its items and cache_hits set by the caller.
+    Functions such as the intersections add to the innermost evaluation with
+    count_rays. Peak memory is only traced when enabled in the node UI.
+    """
+
+    def __init__(self, node):
+        self.key = (node.id_data.name, node.name)
+        self.node_type = node.bl_idname
+        self.evaluation = Evaluation(self.key)
+
+    def __enter__(self):
+        self._trace = bpy.context.window_manager.lb_trace_memory
+        if self._trace:
+            self._was_tracing = tracemalloc.is_tracing()
+            if not self._was_tracing:
+                tracemalloc.start()
+            elif hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+        active_evaluations().append(self.evaluation)
+        self._start = time.perf_counter()
+        return self.evaluation
+
+    def __exit__(self, *exc_info):
+        evaluation = self.evaluation
+        evaluation.wall_time = time.perf_counter() - self._start
+        active_evaluations().pop()
+        if self._trace:
+            evaluation.peak_memory = tracemalloc.get_traced_memory()[1]
+            if not self._was_tracing:
+                tracemalloc.stop()
+        stats = _stats.get(self.key)
+        if stats is None:
+            stats = _stats[self.key] = NodeStats(self.node_type)
+        stats.add(evaluation)
+        return False
+
+
+def active_evaluations():
+    try:
+        return _local.active
+    except AttributeError:
+        _local.active = []
+        return _local.active
+
+
+def count_rays(count):
+    """Add a number of traced rays to the evaluation measured in this thread, if any."""
+    active = getattr(_local, 'active', None)
+    if active:
+        active[-1].rays += count
+
+
+def current_node_key():
+    """Get the (node tree name, node name) of the node evaluated in this thread, or None."""
+    active = getattr(_local, 'active', None)
+    return active[-1].node_key if active else None
+
+
+def node_stats(node):
+    return _stats.get((node.id_data.name, node.name))
+
+
+def tree_stats(tree):
+    """Get a dictionary of the statistics of each node of a node tree."""
+    return {key[1]: stats.to_dict() for key, stats in _stats.items() if key[0] == tree.name}
+
+
+def format_memory(size):
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return '{:.0f} {}'.format(size, unit)
+        size /= 1024.0
+    return '{:.1f} GB'.format(size)
+
+
+def draw_stats(node, context, layout):
+    """Draw the last and average statistics of a node."""
+    stats = node_stats(node)
+    if stats is None or stats.last is None:
+        return
+    last = stats.last
+    col = layout.column(align=True)
+    col.label(text='Last {:.3f} s, avg {:.3f} s ({} runs)'.format(
+        last.wall_time, stats.average('wall_time'), stats.runs), icon='TIME')
+    details = ['{} items'.format(last.items)]
+    if last.rays:
+        details.append('{} rays'.format(last.rays))
+    if last.cache_hits:
+        details.append('{} cached'.format(last.cache_hits))
+    if last.peak_memory:
+        details.append('peak {}'.format(format_memory(last.peak_memory)))
+    col.label(text=', '.join(details))
+    row = col.row(align=True)
+    row.prop(context.window_manager, 'lb_trace_memory')
+    op = row.operator('node.sv_lb_export_stats', text='', icon='EXPORT')
+    op.idtree = node.id_data.name
+
+
+class SvLBExportStats(bpy.types.Operator, ExportHelper):
+    bl_idname = "node.sv_lb_export_stats"
+    bl_label = "Export Ladybug Stats"
+    bl_description = "Export the performance statistics of the nodes of this tree to JSON"
+
+    filename_ext = '.json'
+    filter_glob: StringProperty(default='*.json', options={'HIDDEN'})
+    idtree: StringProperty(default='')
+
+    def execute(self, context):
+        with open(self.filepath, 'w') as f:
+            json.dump(tree_stats(bpy.data.node_groups[self.idtree]), f, indent=4)
+        return {'FINISHED'}
+
+
+def register():
+    bpy.types.WindowManager.lb_trace_memory = BoolProperty(
+        name='Trace Memory', default=False,
+        description='Measure the peak memory of Ladybug node evaluations, which slows them down')
+    bpy.utils.register_class(SvLBExportStats)
+
+
+def unregister():
+    bpy.utils.unregister_class(SvLBExportStats)
+    del bpy.types.WindowManager.lb_trace_memory
+    _stats.clear()
@@ -9,6 +9,8 @@ import types
 import mathutils.geometry
 import array as specializedarray
 from .config import tolerance
+from .instrument import count_rays
+from .progress import check_cancelled
 from mathutils import Vector, Matrix
 
 
@@ -102,6 +104,7 @@ def intersect_mesh_rays(
             matrix represents one of the normals and has a length equal to the
             supplied vectors. Will be None if no normals are provided.
     """
+    count_rays(len(points) * len(vectors))
     intersection_matrix = [0] * len(points)  # matrix to be filled with results
     angle_matrix = [0] * len(normals) if normals is not None else None
     cutoff_angle = math.pi / 2  # constant used in all normal checks
@@ -110,6 +113,7 @@ def intersect_mesh_rays(
 
     def intersect_point(i):
         """Intersect all of the vectors of a given point without any normal check."""
+        check_cancelled()
         pt = points[i]
         int_list = []
         for vec in vectors:
@@ -121,6 +125,7 @@ def intersect_mesh_rays(
 
     def intersect_point_normal_check(i):
         """Intersect all of the vectors of a given point with a normal check."""
+        check_cancelled()
         pt, normal_vec = points[i], normals[i]
         int_list = []
         angle_list = []
@@ -209,12 +214,14 @@ def intersect_mesh_lines(
         length equal to the end_points. 0 indicates a blocked ray and 1 indicates
         a ray that was not blocked.
     """
+    count_rays(len(start_points) * len(end_points))
     int_matrix = [0] * len(start_points)  # matrix to be filled with results
     if not parallel:
         cpu_count = 1
 
     def intersect_line(i):
         """Intersect a line defined by a start and an end with the mesh."""
+        check_cancelled()
         pt = start_points[i]
         int_list = []
         for ept in end_points:
@@ -226,6 +233,7 @@ def intersect_mesh_lines(
 
     def intersect_line_dist_check(i):
         """Intersect a line with the mesh with a distance check."""
+        check_cancelled()
         pt = start_points[i]
         int_list = []
         for ept in end_points:
@@ -303,6 +311,7 @@ def intersect_solids_parallel(solids, bound_boxes, cpu_count=None):
 
     def intersect_each_solid(i):
         """Intersect a solid with all of the other solids of the list."""
+        check_cancelled()
         bb_1 = bound_boxes[i]
         # intersect the solids that come after this one
         for j, bb_2 in enumerate(bound_boxes[i + 1:]):
@@ -356,6 +365,7 @@ def intersect_solids(solids, bound_boxes):
     int_solids = solids[:]  # copy the input list to avoid editing it
 
     for i, bb_1 in enumerate(bound_boxes):
+        check_cancelled()
         for j, bb_2 in enumerate(bound_boxes[i + 1:]):
             if not overlapping_bounding_boxes(bb_1, bb_2):
                 continue  # no overlap in bounding box; intersection impossible
@@ -1,20 +1,11 @@
 import bpy
-from bpy.props import BoolProperty, StringProperty
+import numpy as np
+from bpy.props import BoolProperty, EnumProperty, FloatProperty, StringProperty
 from bpy.types import Operator
 from sverchok.node_tree import SverchCustomTreeNode
-from sverchok.data_structure import multi_socket, updateNode, zip_long_repeat
-
-from ladybug_tools.text import LadybugText
-from ladybug_tools.colorize import ColoredPoint
-from ladybug_geometry.geometry2d.line import LineSegment2D
-from ladybug_geometry.geometry2d.arc import Arc2D
-from ladybug_geometry.geometry3d.arc import Arc3D
-from ladybug_geometry.geometry2d.mesh import Mesh2D
-from ladybug_geometry.geometry3d.mesh import Mesh3D
-from ladybug_geometry.geometry2d.pointvector import Point2D
-from ladybug_geometry.geometry3d.pointvector import Point3D
-from ladybug_geometry.geometry2d.polyline import Polyline2D
-from ladybug_geometry.geometry3d.polyline import Polyline3D
+from sverchok.data_structure import multi_socket, updateNode
+
+from ladybug_tools.instrument import measure, draw_stats
 
 from math import pi, sin, cos
 from mathutils import Vector, Matrix
@@ -26,12 +17,26 @@ class SvLBOut(bpy.types.Node, SverchCustomTreeNode):
     base_name = 'geometry '
     multi_socket_type = 'SvStringsSocket'
     should_bake: BoolProperty(default=False, update=updateNode, name="BAKE ?")
+    output_mode: EnumProperty(name="Output", update=updateNode, default='LISTS', items=[
+        ('LISTS', 'Lists', 'Output Python lists of verts, edges and faces for each geometry'),
+        ('ARRAYS', 'Arrays', 'Output NumPy arrays and merge all points into a single vertex list')])
+    use_pcv: BoolProperty(default=False, update=updateNode, name="Point Cloud Visualizer",
+        description="Draw colored points with the Point Cloud Visualizer add-on instead of a native mesh")
+    text_mode: EnumProperty(name="Text", update=updateNode, default='CURVES', items=[
+        ('CURVES', 'Curves', 'Bake each label as its own text curve'),
+        ('MESH', 'Mesh', 'Convert each distinct label to a mesh once and bake repeated labels as linked duplicates')])
+    bake_mode: EnumProperty(name="Bake", update=updateNode, default='LIVE', items=[
+        ('LIVE', 'Live', 'Bake to the scene every time the node is processed'),
+        ('DEFERRED', 'Deferred', 'Stage the geometry and bake it with the Bake button or after a delay')])
+    bake_delay: FloatProperty(name="Delay", default=0, min=0, unit='TIME',
+        description="Seconds without changes before staged geometry is baked. Zero waits for the Bake button")
 
     def sv_init(self, context):
         self.inputs.new('SvStringsSocket', 'geometry')
         self.outputs.new('SvVerticesSocket', "verts")
         self.outputs.new('SvStringsSocket', "edges")
         self.outputs.new('SvStringsSocket', "faces")
+        self.outputs.new('SvColorSocket', "colors")
 
     def sv_update(self):
         if len(self.outputs) > 0:
@@ -40,77 +45,106 @@ class SvLBOut(bpy.types.Node, SverchCustomTreeNode):
     def draw_buttons(self, context, layout):
         r0 = layout.row()
         r0.prop(self, "should_bake")
+        if self.should_bake:
+            r0.prop(self, "bake_mode", text="")
+            layout.prop(self, "text_mode", expand=True)
+            if self.bake_mode == 'DEFERRED':
+                r = layout.row(align=True)
+                r.prop(self, "bake_delay")
+                op = r.operator('node.sv_lb_out_bake', text='Bake', icon='IMPORT')
+                op.idtree = self.id_data.name
+                op.idname = self.name
+        r1 = layout.row()
+        r1.prop(self, "use_pcv")
+        layout.prop(self, "output_mode", expand=True)
+        draw_stats(self, context, layout)
 
     def process(self):
+        with measure(self) as evaluation:
+            self.process_geometry(evaluation)
+
+    def process_geometry(self, evaluation):
         self.v = []
         self.e = []
         self.f = []
+        self.c = []
         self.text_v = []
         self.text_s = []
-        self.blender_v = []
-        self.blender_colored_v = []
+        self.use_arrays = self.output_mode == 'ARRAYS'
+        self.point_v = []
 
+        should_bake = self.should_bake
+        staged = []
+        cache = _geometry_handler_cache
         for socket in self.inputs:
             if not (socket.is_linked and socket.links):
                 continue
-            for geometries in socket.sv_get():
-                for geometry in geometries:
-                    self._process_geometry(geometry)
-        
-        if self.should_bake:
-            self.create_blender_colored_v()
-            self.create_wireframe([Vector(xyz) for xyz in self.blender_v], [])
+            for geometry in iter_geometry(socket.sv_get()):
+                handlers = cache.get(geometry.__class__)
+                if handlers is None:
+                    handlers = get_geometry_handlers(geometry.__class__)
+                handlers[0](self, geometry)
+                evaluation.items += 1
+                if should_bake:
+                    staged.append((handlers[1], geometry))
+
+        if should_bake:
+            if self.bake_mode == 'DEFERRED':
+                self.stage_bake(staged)
+            else:
+                self.bake(staged)
+        if self.use_arrays:
+            self.set_sverchok_arrays()
         self.outputs['verts'].sv_set(self.v)
         self.outputs['edges'].sv_set(self.e)
         self.outputs['faces'].sv_set(self.f)
+        if 'colors' in self.outputs:
+            self.outputs['colors'].sv_set(self.c)
+
+    @property
+    def bake_key(self):
+        return (self.id_data.name, self.name)
+
+    def stage_bake(self, staged):
+        """Keep geometry to bake later, replacing anything staged before."""
+        _staged_bakes[self.bake_key] = staged
+        if self.bake_delay > 0:
+            schedule_bake(self.bake_key, self.bake_delay)
+
+    def bake_staged(self):
+        staged = _staged_bakes.pop(self.bake_key, None)
+        if staged:
+            self.bake(staged)
 
-    def _process_geometry(self, geometry):
-        if isinstance(geometry, (tuple, list)):
-            for g in geometry:
-                self._process_geometry(g)
+    def bake(self, staged):
+        self.blender_v = []
+        self.blender_colored_v = []
+        self.text_meshes = {}
+        self.text_material = None
+        for handler, geometry in staged:
+            handler(self, geometry)
+        self.create_blender_colored_v()
+        if self.blender_v:
+            self.create_wireframe([Vector(xyz) for xyz in self.blender_v], [])
+
+    def append_sverchok(self, v, e, f=None, c=None):
+        self.c.append([] if c is None else c)
+        if self.use_arrays:
+            self.v.append(np.array(v, dtype=np.float64).reshape(-1, 3))
+            self.e.append(np.array(e, dtype=np.int32).reshape(-1, 2))
+            self.f.append([] if f is None else f)
             return
-        self._process_sverchok_geometry(geometry)
-        if self.should_bake:
-            self._process_blender_geometry(geometry)
-
-    def _process_sverchok_geometry(self, geometry):
-        if isinstance(geometry, Arc2D):
-            self.sverchok_from_arc2d(geometry)
-        elif isinstance(geometry, Arc3D):
-            self.sverchok_from_arc3d(geometry)
-        elif isinstance(geometry, LineSegment2D):
-            self.sverchok_from_linesegment2d(geometry)
-        elif isinstance(geometry, (Point2D, Point3D)):
-            self.sverchok_from_point(geometry)
-        elif isinstance(geometry, (Polyline2D, Polyline3D)):
-            self.sverchok_from_polyline(geometry)
-        elif isinstance(geometry, (float, int, tuple, list, str)):
-            pass # The user probably connected a non geometry node
-        else:
-            print('WARNING: geometry {} not yet supported in Sverchok: {}'.format(type(geometry), geometry))
-
-    def _process_blender_geometry(self, geometry):
-        if isinstance(geometry, Arc2D):
-            self.blender_from_arc2d(geometry)
-        elif isinstance(geometry, Arc3D):
-            self.blender_from_arc3d(geometry)
-        elif isinstance(geometry, ColoredPoint):
-            self.blender_colored_v.append(geometry)
-        elif isinstance(geometry, LineSegment2D):
-            self.blender_from_linesegment2d(geometry)
-        elif isinstance(geometry, LadybugText):
-            self.blender_from_text(geometry)
-        elif isinstance(geometry, (Mesh2D, Mesh3D)):
-            self.blender_from_mesh(geometry)
-        elif isinstance(geometry, (Point2D, Point3D)):
-            # Points are much more efficient in a single mesh
-            self.blender_v.append(self.from_point(geometry))
-        elif isinstance(geometry, (Polyline2D, Polyline3D)):
-            self.blender_from_polyline(geometry)
-        elif isinstance(geometry, (float, int, tuple, list, str)):
-            pass # The user probably connected a non geometry node
-        else:
-            print('WARNING: geometry {} not yet supported in Blender: {}'.format(type(geometry), geometry))
+        self.v.append(v)
+        self.e.append(e)
+        self.f.append(f or [[0]]) # Hack
+
+    def set_sverchok_arrays(self):
+        if self.point_v:
+            # All points share one vertex list with no topology
+            self.v.append(np.array(self.point_v, dtype=np.float64))
+            self.e.append(np.empty((0, 2), dtype=np.int32))
+            self.f.append([])
+            self.c.append([])
 
     def from_linesegment2d(self, line, z=0):
         """Rhino LineCurve from ladybug LineSegment2D."""
@@ -119,9 +153,7 @@ class SvLBOut(bpy.types.Node, SverchCustomTreeNode):
 
     def sverchok_from_linesegment2d(self, line, z=0):
         v, e = self.from_linesegment2d(line, z)
-        self.v.append(v)
-        self.e.append(e)
-        self.f.append([[0]]) # Hack
+        self.append_sverchok(v, e)
 
     def blender_from_linesegment2d(self, line, z=0):
         self.create_wireframe(*self.from_linesegment2d(line))
@@ -142,9 +174,7 @@ class SvLBOut(bpy.types.Node, SverchCustomTreeNode):
 
     def sverchok_from_arc2d(self, arc, z=0):
         v, e = self.from_arc2d(arc, z)
-        self.v.append(v)
-        self.e.append(e)
-        self.f.append([[0]]) # Hack
+        self.append_sverchok(v, e)
 
     def blender_from_arc2d(self, arc, z=0):
         self.create_wireframe(*self.from_arc2d(arc))
@@ -178,13 +208,40 @@ class SvLBOut(bpy.types.Node, SverchCustomTreeNode):
 
     def sverchok_from_arc3d(self, arc):
         v, e = self.from_arc3d(arc)
-        self.v.append(v)
-        self.e.append(e)
-        self.f.append([[0]]) # Hack
+        self.append_sverchok(v, e)
 
     def blender_from_arc3d(self, arc):
         self.create_wireframe(*self.from_arc3d(arc))
 
+    def from_mesh(self, mesh):
+        """Vertex, face and RGBA color arrays from a ladybug Mesh2D or Mesh3D."""
+        from ladybug_geometry.geometry3d.mesh import Mesh3D  # imported by then
+        is_3d = isinstance(mesh, Mesh3D)
+        v = np.fromiter(
+            (c for p in mesh.vertices for c in ((p.x, p.y, p.z) if is_3d else (p.x, p.y, 0))),
+            dtype=np.float64, count=len(mesh.vertices) * 3).reshape(-1, 3)
+        face_sizes = set(len(face) for face in mesh.faces)
+        if len(face_sizes) == 1:
+            f = np.array(mesh.faces, dtype=np.int32)
+        else: # Mixed triangles and quads can't share one array
+            f = [list(face) for face in mesh.faces]
+        c = None
+        if mesh.colors:
+            c = np.fromiter(
+                (x for color in mesh.colors for x in (color.r, color.g, color.b, color.a)),
+                dtype=np.float32, count=len(mesh.colors) * 4).reshape(-1, 4)
+            c /= 255
+        return v, f, c
+
+    def sverchok_from_mesh(self, mesh):
+        # Colors are per face or per vertex, following mesh.is_color_by_face
+        v, f, c = self.from_mesh(mesh)
+        if not self.use_arrays:
+            v = v.tolist()
+            f = f.tolist() if isinstance(f, np.ndarray) else f
+            c = c.tolist() if c is not None else None
+        self.append_sverchok(v, [], f, c)
+
     def blender_from_mesh(self, mesh, z=0):
         """Rhino Mesh from ladybug Mesh2D."""
         data = bpy.data.meshes.new('Ladybug Mesh')
@@ -207,20 +264,7 @@ class SvLBOut(bpy.types.Node, SverchCustomTreeNode):
             material_index = [material_to_slot[get_material_name(c)] for c in mesh.colors]
             data.polygons.foreach_set('material_index', material_index)
         else:
-            material = bpy.data.materials.get('LB_VCol')
-            if not material:
-                material = bpy.data.materials.new('LB_VCol')
-                material.use_nodes = True
-                for node in material.node_tree.nodes:
-                    if node.type == 'OUTPUT_MATERIAL':
-                        output_node = node
-                        break
-                emission = material.node_tree.nodes.new(type='ShaderNodeEmission')
-                attribute = material.node_tree.nodes.new(type='ShaderNodeAttribute')
-                attribute.attribute_name = 'LB_Col'
-                material.node_tree.links.new(attribute.outputs[0], emission.inputs[0])
-                material.node_tree.links.new(emission.outputs[0], output_node.inputs[0])
-            data.materials.append(material)
+            data.materials.append(self.get_vertex_color_material())
             data.vertex_colors.new(name='LB_Col')
             for polygon in data.polygons:
                 for i, vi in enumerate(polygon.vertices):
@@ -234,10 +278,18 @@ class SvLBOut(bpy.types.Node, SverchCustomTreeNode):
         """Rhino Point3d from ladybug Point3D."""
         return (point.x, point.y, point.z if hasattr(point, 'z') else 0)
 
+    def blender_from_point(self, point):
+        # Points are much more efficient in a single mesh
+        self.blender_v.append(self.from_point(point))
+
+    def blender_from_colored_point(self, colored_point):
+        self.blender_colored_v.append(colored_point)
+
     def sverchok_from_point(self, point):
-        self.v.append([self.from_point(point)])
-        self.e.append([[0, 0]]) # Hack
-        self.f.append([[0]]) # Hack
+        if self.use_arrays:
+            self.point_v.append(self.from_point(point))
+            return
+        self.append_sverchok([self.from_point(point)], [[0, 0]]) # Hack
 
     def from_polyline(self, polyline, z=0):
         """Rhino closed PolyLineCurve from ladybug Polyline3D."""
@@ -257,14 +309,12 @@ class SvLBOut(bpy.types.Node, SverchCustomTreeNode):
 
     def sverchok_from_polyline(self, polyline, z=0):
         v, e = self.from_polyline(polyline, z)
-        self.v.append(v)
-        self.e.append(e)
-        self.f.append([[0]]) # Hack
+        self.append_sverchok(v, e)
 
     def blender_from_polyline(self, polyline, z=0):
         self.create_wireframe(*self.from_polyline(polyline, z))
 
-    def blender_from_text(self, text):
+    def from_text(self, text):
         data = bpy.data.curves.new('Ladybug Text', 'FONT')
         data.body = text.text
         data.size = text.height
@@ -283,27 +333,100 @@ class SvLBOut(bpy.types.Node, SverchCustomTreeNode):
         elif text.vertical_alignment <= 6:
             data.align_y = 'BOTTOM'
 
-        name = 'ladybug-0-0-0-255'
-        material = bpy.data.materials.get(name)
-        if not material:
-            material = bpy.data.materials.new(name)
-            material.diffuse_color = (0, 0, 0, 255)
-            material.specular_intensity = 0
-        data.materials.append(material)
+        data.materials.append(self.get_text_material())
+        return data
 
+    def blender_from_text(self, text):
+        if self.text_mode == 'MESH':
+            data = self.get_text_mesh(text)
+        else:
+            data = self.from_text(text)
         obj = bpy.data.objects.new('Ladybug Text', data)
         obj.location = (text.plane.o.x, text.plane.o.y, text.plane.o.z)
         bpy.context.scene.collection.objects.link(obj)
 
+    def get_text_mesh(self, text):
+        """Mesh of a label, converted once per distinct string and shared by its duplicates."""
+        key = (text.text, text.height, text.horizontal_alignment, text.vertical_alignment)
+        mesh = self.text_meshes.get(key)
+        if mesh is None:
+            curve = self.from_text(text)
+            obj = bpy.data.objects.new('Ladybug Text', curve)
+            mesh = bpy.data.meshes.new_from_object(obj)
+            mesh.name = 'Ladybug Text'
+            if not mesh.materials:
+                mesh.materials.append(self.get_text_material())
+            bpy.data.objects.remove(obj)
+            bpy.data.curves.remove(curve)
+            self.text_meshes[key] = mesh
+        return mesh
+
+    def get_text_material(self):
+        if self.text_material is None:
+            name = 'ladybug-0-0-0-255'
+            material = bpy.data.materials.get(name)
+            if not material:
+                material = bpy.data.materials.new(name)
+                material.diffuse_color = (0, 0, 0, 255)
+                material.specular_intensity = 0
+            self.text_material = material
+        return self.text_material
+
+    def get_vertex_color_material(self):
+        material = bpy.data.materials.get('LB_VCol')
+        if not material:
+            material = bpy.data.materials.new('LB_VCol')
+            material.use_nodes = True
+            for node in material.node_tree.nodes:
+                if node.type == 'OUTPUT_MATERIAL':
+                    output_node = node
+                    break
+            emission = material.node_tree.nodes.new(type='ShaderNodeEmission')
+            attribute = material.node_tree.nodes.new(type='ShaderNodeAttribute')
+            attribute.attribute_name = 'LB_Col'
+            material.node_tree.links.new(attribute.outputs[0], emission.inputs[0])
+            material.node_tree.links.new(emission.outputs[0], output_node.inputs[0])
+        return material
+
+    def from_colored_points(self, colored_points):
+        """Flat coordinate and RGBA arrays from a list of ColoredPoints."""
+        count = len(colored_points)
+        co = np.fromiter(
+            (c for cv in colored_points for c in self.from_point(cv.point)),
+            dtype=np.float32, count=count * 3)
+        rgba = np.fromiter(
+            (c for cv in colored_points for c in (cv.color.r, cv.color.g, cv.color.b, cv.color.a)),
+            dtype=np.float32, count=count * 4)
+        rgba /= 255
+        return co, rgba
+
     def create_blender_colored_v(self):
         if not self.blender_colored_v:
             return
-        import numpy as np
+        if self.use_pcv:
+            return self.create_pcv_colored_v()
+        data = bpy.data.meshes.new('Ladybug Colored Points')
+        try:
+            # Vertex-only meshes have no loops, so store the colors per point
+            attribute = data.attributes.new('LB_Col', 'FLOAT_COLOR', 'POINT')
+        except (AttributeError, TypeError):  # Blender before generic color attributes
+            bpy.data.meshes.remove(data)
+            return self.create_pcv_colored_v()
+        co, rgba = self.from_colored_points(self.blender_colored_v)
+        data.vertices.add(len(co) // 3)
+        data.vertices.foreach_set('co', co)
+        attribute = data.attributes['LB_Col']  # adding vertices reallocates its data
+        attribute.data.foreach_set('color', rgba)
+        data.materials.append(self.get_vertex_color_material())
+        data.update()
+        obj = bpy.data.objects.new('Ladybug Colored Points', data)
+        bpy.context.scene.collection.objects.link(obj)
+
+    def create_pcv_colored_v(self):
         from space_view3d_point_cloud_visualizer import PCVControl
+        co, rgba = self.from_colored_points(self.blender_colored_v)
         obj = bpy.data.objects.new('Ladybug Colored Points', None)
-        vs = [(cv.point.x, cv.point.y, cv.point.z if hasattr(cv.point, 'z') else 0) for cv in self.blender_colored_v]
-        cs = [(cv.color.r/255, cv.color.g/255, cv.color.b/255) for cv in self.blender_colored_v]
-        PCVControl(obj).draw(vs, [], cs)
+        PCVControl(obj).draw(co.reshape(-1, 3), [], rgba.reshape(-1, 4)[:, :3])
         bpy.context.scene.collection.objects.link(obj)
 
     def create_wireframe(self, v, e):
@@ -313,8 +436,147 @@ class SvLBOut(bpy.types.Node, SverchCustomTreeNode):
         bpy.context.scene.collection.objects.link(obj)
 
 
+class SvLBOutBake(Operator):
+    bl_idname = "node.sv_lb_out_bake"
+    bl_label = "Bake LB Out"
+    bl_description = "Bake the geometry staged by the LB Out node to the scene"
+    bl_options = {'UNDO'}
+
+    idtree: StringProperty(default='')
+    idname: StringProperty(default='')
+
+    def execute(self, context):
+        node = bpy.data.node_groups[self.idtree].nodes[self.idname]
+        node.bake_staged()
+        return {'FINISHED'}
+
+
+# Geometry waiting to be baked, keyed by (node tree name, node name)
+_staged_bakes = {}
+_bake_timers = {}
+
+
+def schedule_bake(key, delay):
+    """Bake the staged geometry of a node once it has not changed for delay seconds."""
+    timer = _bake_timers.get(key)
+    if timer is not None and bpy.app.timers.is_registered(timer):
+        bpy.app.timers.unregister(timer)
+
+    def timer():
+        _bake_timers.pop(key, None)
+        tree = bpy.data.node_groups.get(key[0])
+        node = tree.nodes.get(key[1]) if tree else None
+        if node is None:
+            _staged_bakes.pop(key, None)
+        else:
+            node.bake_staged()
+        return None
+
+    _bake_timers[key] = timer
+    bpy.app.timers.register(timer, first_interval=delay)
+
+
+def iter_geometry(geometries):
+    """Yield the geometry leaves of nested lists in order, without recursion."""
+    stack = [iter(geometries)]
+    while stack:
+        for geometry in stack[-1]:
+            if isinstance(geometry, (tuple, list)):
+                stack.append(iter(geometry))
+                break
+            yield geometry
+        else:
+            stack.pop()
+
+
+def _ignore_geometry(node, geometry):
+    pass # The user probably connected a non geometry node
+
+
+def _unsupported_in_sverchok(node, geometry):
+    print('WARNING: geometry {} not yet supported in Sverchok: {}'.format(type(geometry), geometry))
+
+
+def _unsupported_in_blender(node, geometry):
+    print('WARNING: geometry {} not yet supported in Blender: {}'.format(type(geometry), geometry))
+
+
+sverchok_geometry_handlers = {}
+blender_geometry_handlers = {}
+_geometry_handler_cache = {}
+
+
+def class_path(cls):
+    return '{}.{}'.format(cls.__module__, cls.__qualname__)
+
+
+def register_geometry_handler(geometry_type, sverchok=None, blender=None):
+    """Register the functions used by LB Out to convert a type of geometry.
+
+    Subclasses of geometry_type use the same functions unless they are
+    registered separately.
+
+    Args:
+        geometry_type: The class of the geometry to be converted, or its
+            dotted path (eg. 'ladybug_geometry.geometry3d.mesh.Mesh3D'). A path
+            avoids importing the module of the class until geometry of that
+            type reaches the node.
+        sverchok: A function taking the node and a geometry, which appends the
+            geometry to the node's verts, edges and faces outputs.
+        blender: A function taking the node and a geometry, which bakes the
+            geometry to the Blender scene.
+    """
+    if sverchok is not None:
+        sverchok_geometry_handlers[geometry_type] = sverchok
+    if blender is not None:
+        blender_geometry_handlers[geometry_type] = blender
+    _geometry_handler_cache.clear()
+
+
+def _find_geometry_handler(handlers, geometry_type, default):
+    for cls in geometry_type.__mro__:
+        handler = handlers.get(cls) or handlers.get(class_path(cls))
+        if handler is not None:
+            return handler
+    return default
+
+
+def get_geometry_handlers(geometry_type):
+    """Get the (sverchok, blender) functions converting a type of geometry."""
+    handlers = _geometry_handler_cache.get(geometry_type)
+    if handlers is None:
+        handlers = (
+            _find_geometry_handler(sverchok_geometry_handlers, geometry_type, _unsupported_in_sverchok),
+            _find_geometry_handler(blender_geometry_handlers, geometry_type, _unsupported_in_blender))
+        _geometry_handler_cache[geometry_type] = handlers
+    return handlers
+
+
+for geometry_type in (float, int, tuple, list, str):
+    register_geometry_handler(geometry_type, sverchok=_ignore_geometry, blender=_ignore_geometry)
+# Registered by path, so that ladybug is only imported once geometry is output
+register_geometry_handler('ladybug_geometry.geometry2d.arc.Arc2D', sverchok=SvLBOut.sverchok_from_arc2d, blender=SvLBOut.blender_from_arc2d)
+register_geometry_handler('ladybug_geometry.geometry3d.arc.Arc3D', sverchok=SvLBOut.sverchok_from_arc3d, blender=SvLBOut.blender_from_arc3d)
+register_geometry_handler('ladybug_tools.colorize.ColoredPoint', blender=SvLBOut.blender_from_colored_point)
+register_geometry_handler('ladybug_geometry.geometry2d.line.LineSegment2D', sverchok=SvLBOut.sverchok_from_linesegment2d, blender=SvLBOut.blender_from_linesegment2d)
+register_geometry_handler('ladybug_tools.text.LadybugText', blender=SvLBOut.blender_from_text)
+for geometry_type in ('geometry2d.mesh.Mesh2D', 'geometry3d.mesh.Mesh3D'):
+    register_geometry_handler('ladybug_geometry.' + geometry_type, sverchok=SvLBOut.sverchok_from_mesh, blender=SvLBOut.blender_from_mesh)
+for geometry_type in ('geometry2d.pointvector.Point2D', 'geometry3d.pointvector.Point3D'):
+    register_geometry_handler('ladybug_geometry.' + geometry_type, sverchok=SvLBOut.sverchok_from_point, blender=SvLBOut.blender_from_point)
+for geometry_type in ('geometry2d.polyline.Polyline2D', 'geometry3d.polyline.Polyline3D'):
+    register_geometry_handler('ladybug_geometry.' + geometry_type, sverchok=SvLBOut.sverchok_from_polyline, blender=SvLBOut.blender_from_polyline)
+
+
 def register():
+    bpy.utils.register_class(SvLBOutBake)
     bpy.utils.register_class(SvLBOut)
 
 def unregister():
+    for timer in _bake_timers.values():
+        if bpy.app.timers.is_registered(timer):
+            bpy.app.timers.unregister(timer)
+    _bake_timers.clear()
+    _staged_bakes.clear()
     bpy.utils.unregister_class(SvLBOut)
+    bpy.utils.unregister_class(SvLBOutBake)
@@ -0,0 +1,351 @@
+"""Worker processes to run the items of generated nodes in parallel.
+
+Workers are spawned without Blender, so they can only run node code that
+does not need bpy (eg. code importing ladybug_tools.togeometry). Such items,
+and items whose inputs or outputs can't be pickled, run in Blender instead.
+
+map_indices, behind sverchok.run_function_in_parallel, uses the same worker
+processes for functions they can import, and a pool of threads otherwise.
+"""
+import concurrent.futures
+import concurrent.futures.process
+import functools
+import inspect
+import math
+import multiprocessing
+import os
+import pickle
+import sys
+import textwrap
+import threading
+import types
+
+from .helper import collect_outputs
+from .progress import Cancelled, current_progress, iter_progress, track_progress
+
+
+# Run first in each worker. Importing ladybug_tools would run the add-on's
+# __init__.py, which needs Blender, so the package is stubbed before any of
+# its modules are imported. The ladybug libraries are imported once here.
+_WORKER_BOOTSTRAP = '''
+import sys, types
+package = types.ModuleType('ladybug_tools')
+package.__path__ = [{package_dir!r}]
+sys.modules.setdefault('ladybug_tools', package)
+for name in ('ladybug', 'ladybug_geometry', 'ladybug_comfort'):
+    try:
+        __import__(name)
+    except ImportError:
+        pass
+'''
+
+# Modules which workers can't import, as they are only available in Blender
+BLENDER_MODULES = ('__main__', 'bpy', 'bmesh', 'mathutils', 'sverchok')
+
+_process_pool = None
+_process_pool_workers = 0
+_thread_pool = None
+_thread_pool_workers = 0
+_local = threading.local()  # in_pool: whether the thread is one of the pool's
+_sources = {}
+_functions = {}
+_importable_modules = {}
+
+
+def is_picklable(value):
+    try:
+        pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return False
+    return True
+
+
+def python_executable():
+    """Get the Python interpreter used to spawn workers from Blender."""
+    try:
+        import bpy
+    except ImportError:
+        return sys.executable
+    # Before Blender 2.91 sys.executable is the Blender binary itself
+    return getattr(bpy.app, 'binary_path_python', None) or sys.executable
+
+
+def process_pool(cpu_count=None):
+    """Get the persistent pool of worker processes, starting it if needed.
+
+    Args:
+        cpu_count: An integer for the number of worker processes. If None, the
+            recommended_processor_count will be used. The pool is restarted if
+            a different count is requested.
+    """
+    from .sverchok import recommended_processor_count  # loads NumPy, so not when the add-on starts
+    global _process_pool, _process_pool_workers
+    workers = cpu_count or recommended_processor_count()
+    if _process_pool is not None and _process_pool_workers != workers:
+        shutdown()
+    if _process_pool is None:
+        context = multiprocessing.get_context('spawn')
+        context.set_executable(python_executable())
+        bootstrap = _WORKER_BOOTSTRAP.format(package_dir=os.path.dirname(__file__))
+        _process_pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, mp_context=context,
+            initializer=exec, initargs=(bootstrap,))
+        _process_pool_workers = workers
+    return _process_pool
+
+
+def discard_process_pool(pool):
+    """Forget a pool whose worker died, so that the next one is started afresh."""
+    global _process_pool
+    if _process_pool is pool:
+        _process_pool = None
+    pool.shutdown(wait=False)
+
+
+def thread_pool(cpu_count=None):
+    """Get the persistent pool of worker threads, starting it if needed.
+
+    Args:
+        cpu_count: An integer for the number of worker threads. If None, the
+            recommended_processor_count will be used. The pool is restarted if
+            a different count is requested.
+    """
+    from .sverchok import recommended_processor_count
+    global _thread_pool, _thread_pool_workers
+    workers = cpu_count or recommended_processor_count()
+    if _thread_pool is not None and _thread_pool_workers != workers:
+        _thread_pool.shutdown(wait=False)
+        _thread_pool = None
+    if _thread_pool is None:
+        _thread_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='ladybug')
+        _thread_pool_workers = workers
+    return _thread_pool
+
+
+def shutdown():
+    """Stop the worker processes and threads."""
+    global _process_pool, _thread_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False)
+        _process_pool = None
+    if _thread_pool is not None:
+        _thread_pool.shutdown(wait=False)
+        _thread_pool = None
+
+
+def is_importable_by_workers(function):
+    """Check that worker processes can unpickle a function, by importing its module.
+
+    The module must not use Blender, which the workers don't have.
+    """
+    module = sys.modules.get(getattr(function, '__module__', None))
+    if module is None:
+        return False
+    importable = _importable_modules.get(module.__name__)
+    if importable is None:
+        importable = module.__name__.split('.')[0] not in BLENDER_MODULES and not any(
+            isinstance(value, types.ModuleType) and value.__name__.split('.')[0] in BLENDER_MODULES
+            for value in vars(module).values())
+        _importable_modules[module.__name__] = importable
+    return importable
+
+
+def run_range(function, start, stop, progress=None):
+    """Call a function with each index of a range in a worker.
+
+    Args:
+        function: A function taking an integer index.
+        start: The first index.
+        stop: The index after the last one.
+        progress: An optional Progress of the caller, for threads to check.
+
+    Returns:
+        A list with the result of each call.
+    """
+    _local.in_pool = True
+    try:
+        with track_progress(progress):
+            return [function(i) for i in range(start, stop)]
+    finally:
+        _local.in_pool = False
+
+
+def map_indices(function, count, cpu_count=None):
+    """Call function(i) for each i in range(count), in chunks run by workers.
+
+    Functions which can be pickled and imported without Blender (eg. functions
+    at the top of a ladybug module) run in the worker processes. Changes they
+    make to the data of the caller are lost, so they must return their results.
+    Other functions, like the nested functions of components which fill a
+    list of the caller, run in the worker threads. Calls from within a worker
+    thread run one after the other, so that they can't wait for the pool.
+
+    An exception raised by the function is raised again here, with the
+    traceback of the worker process as its cause. The chunks which have not
+    started yet are cancelled, as they are when the current Progress is.
+
+    Args:
+        function: A function taking an integer index.
+        count: The number of indices.
+        cpu_count: An optional integer for the number of workers. If 1 or less,
+            everything runs in the calling thread.
+
+    Returns:
+        A list with the result of each call, in the order of the indices.
+    """
+    if cpu_count is not None and cpu_count <= 1 or count <= 1 or getattr(_local, 'in_pool', False):
+        return [function(i) for i in iter_progress(range(count))]
+    use_processes = is_picklable(function) and is_importable_by_workers(function)
+    if use_processes:
+        pool, workers = process_pool(cpu_count), _process_pool_workers
+    else:
+        pool, workers = thread_pool(cpu_count), _thread_pool_workers
+    progress = current_progress()
+    if progress is not None:
+        progress.total += count
+
+    chunk_size = int(math.ceil(count / (workers * 4.0)))
+    chunks = []
+    for start in range(0, count, chunk_size):
+        stop = min(start + chunk_size, count)
+        chunks.append((stop - start, pool.submit(
+            run_range, function, start, stop, None if use_processes else progress)))
+    results = []
+    try:
+        for size, future in chunks:
+            results.extend(future.result())
+            if progress is not None:
+                progress.advance(size)
+    except BaseException as e:
+        for _, future in chunks:
+            future.cancel()
+        if isinstance(e, concurrent.futures.process.BrokenProcessPool):
+            discard_process_pool(pool)
+        raise
+    return results
+
+
+def process_source(node_class):
+    """Get the source code of the process_ladybug method of a node class, or None.
+
+    It starts with the source of the function importing the modules of the
+    node, if the node class has one as sv_imports.
+    """
+    try:
+        return _sources[node_class]
+    except KeyError:
+        pass
+    functions = [node_class.process_ladybug]
+    if hasattr(node_class, 'sv_imports'):
+        functions.insert(0, node_class.sv_imports)
+    try:
+        source = '\n'.join(textwrap.dedent(inspect.getsource(f)) for f in functions)
+    except (OSError, TypeError):
+        source = None
+    _sources[node_class] = source
+    return source
+
+
+class StandInNode(object):
+    """Stand-in for a node, with what process_ladybug needs outside of Blender's main thread."""
+
+    def __init__(self, output_names, linked_outputs):
+        self.sv_output_names = output_names
+        self.sv_linked_outputs = linked_outputs
+
+
+def run_items(source, output_names, linked_outputs, items):
+    """Run the process_ladybug source for each item of inputs in a worker.
+
+    Returns:
+        A list with the output values of each item, or None for the items that failed.
+    """
+    function = _functions.get(source)
+    if function is None:
+        from ladybug_tools.helper import ghenv, UNSET
+        namespace = {'ghenv': ghenv, 'UNSET': UNSET, 'functools': functools}
+        try:
+            exec(compile(source, '<ladybug node>', 'exec'), namespace)
+        except Exception:
+            return [None] * len(items)
+        function = _functions[source] = namespace['process_ladybug']
+    node = StandInNode(output_names, linked_outputs)
+    results = []
+    for args in items:
+        try:
+            results.append(function(node, *args))
+        except Exception:
+            results.append(None)  # run again in Blender to report the error
+    return results
+
+
+def process_in_parallel(node, items, memo=None, cpu_count=None):
+    """Run node.process_ladybug for each item of inputs in the worker processes.
+
+    Items which can't be pickled or fail in a worker run in Blender, one
+    after the other. So do the items of a pool whose worker died (eg. killed
+    by the system), which is replaced for the next evaluation.
+
+    Args:
+        node: A generated Ladybug node.
+        items: A list with the list of converted inputs of each item.
+        memo: An optional NodeMemo to reuse and store the outputs of items.
+        cpu_count: An optional integer for the number of worker processes.
+
+    Returns:
+        A tuple with a list of the values of each output, in the order of the items.
+    """
+    keys, outputs = [None] * len(items), [None] * len(items)
+    pending = []
+    for i, args in enumerate(items):
+        if memo is not None:
+            keys[i], outputs[i] = memo.lookup(node, args)
+        if outputs[i] is None and is_picklable(args):
+            pending.append(i)
+
+    futures = {}
+    source = process_source(type(node))
+    if source is not None and len(pending) > 1:
+        pool = process_pool(cpu_count)
+        chunk_size = int(math.ceil(len(pending) / (_process_pool_workers * 4.0)))
+        try:
+            for start in range(0, len(pending), chunk_size):
+                indices = pending[start:start + chunk_size]
+                future = pool.submit(run_items, source, node.sv_output_names,
+                                     node.sv_linked_outputs, [items[i] for i in indices])
+                for offset, i in enumerate(indices):
+                    futures[i] = (future, offset)
+        except concurrent.futures.process.BrokenProcessPool:
+            discard_process_pool(pool)
+            futures.clear()
+
+    try:
+        for i in iter_progress(range(len(items))):
+            if outputs[i] is not None:  # cached
+                continue
+            if i in futures:
+                future, offset = futures[i]
+                try:
+                    outputs[i] = future.result()[offset]
+                except concurrent.futures.process.BrokenProcessPool:
+                    discard_process_pool(pool)
+                except Exception:
+                    pass  # eg. outputs that can't be pickled
+            if outputs[i] is None:
+                outputs[i] = node.process_ladybug(*items[i])
+            if memo is not None:
+                memo.store(keys[i], outputs[i])
+    except Cancelled:
+        for future, _ in futures.values():
+            future.cancel()  # the chunks which have not started yet
+        raise
+    return collect_outputs(len(node.sv_output_names), outputs)
+
+
+def register():
+    pass
+
+
+def unregister():
+    shutdown()
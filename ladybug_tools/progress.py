@@ -0,0 +1,102 @@
+"""Cooperative cancellation and progress of long Ladybug computations.
+
+Long loops call check_cancelled between chunks of work, which raises Cancelled
+once the Progress tracked by the current thread has been cancelled. Any thread
+can cancel it, eg. the cancel button of a node running in the background, or
+a script running a computation in a thread of its own:
+
+    progress = Progress()
+    thread = threading.Thread(target=run_study, args=(progress,))
+    ...
+    progress.cancel()
+
+where run_study does its work within `with track_progress(progress):`.
+"""
+import threading
+
+_local = threading.local()  # progress: the Progress tracked by a thread
+
+
+class Cancelled(Exception):
+    """Raised within a computation once its progress has been cancelled."""
+
+
+class Progress(object):
+    """The number of items done out of the total of a computation.
+
+    Args:
+        total: An integer for the number of items to be done. Loops using
+            iter_progress add their items to it.
+    """
+
+    def __init__(self, total=0):
+        self.total = total
+        self.done = 0
+        self.cancelled = False
+
+    @property
+    def fraction(self):
+        return self.done / float(self.total) if self.total else 0.0
+
+    def cancel(self):
+        """Stop the computation at its next check."""
+        self.cancelled = True
+
+    def check(self):
+        if self.cancelled:
+            raise Cancelled()
+
+    def advance(self, count=1):
+        """Count items as done, then stop if the computation has been cancelled."""
+        self.done += count
+        if self.cancelled:
+            raise Cancelled()
+
+    def iterate(self, items):
+        self.total += len(items)
+        for item in items:
+            yield item
+            self.advance()
+
+
+def current_progress():
+    """Get the Progress tracked by the current thread, or None."""
+    return getattr(_local, 'progress', None)
+
+
+class track_progress(object):
+    """Context manager tracking a Progress in the current thread.
+
+    Args:
+        progress: The Progress to track. If None, a new one is tracked.
+    """
+
+    def __init__(self, progress=None):
+        self.progress = progress if progress is not None else Progress()
+
+    def __enter__(self):
+        self._previous = current_progress()
+        _local.progress = self.progress
+        return self.progress
+
+    def __exit__(self, *exc_info):
+        _local.progress = self._previous
+        return False
+
+
+def check_cancelled():
+    """Raise Cancelled if the Progress tracked by the current thread has been cancelled."""
+    progress = getattr(_local, 'progress', None)
+    if progress is not None and progress.cancelled:
+        raise Cancelled()
+
+
+def iter_progress(items):
+    """Iterate over a sized collection, advancing the current Progress after each item.
+
+    Without a tracked Progress this is a plain iteration, at no extra cost.
+    """
+    progress = getattr(_local, 'progress', None)
+    if progress is None:
+        return iter(items)
+    return progress.iterate(items)
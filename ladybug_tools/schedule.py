@@ -0,0 +1,146 @@
+"""Re-evaluate nodes once their inputs have stopped changing.
+
+Live inputs (eg. an animated sun position, a dragged slider or a watched file)
+make Sverchok update a node tree on every change. Expensive nodes which settle
+skip these updates: each one schedules the node instead, pushing its
+evaluation back until no change has come for the settle time. A timer then
+updates the scheduled nodes of each tree together, at most once per
+MIN_INTERVAL, and the superseded evaluations never run.
+"""
+import bpy
+import time
+from sverchok.data_structure import updateNode
+
+from .background import cancel_job, node_job
+
+MIN_INTERVAL = 0.1  # seconds between the scheduled updates of a node tree
+
+_scheduled = {}  # node tree name: ScheduledUpdate
+_last_updates = {}  # node tree name: time of its last scheduled update
+_released = set()  # (node tree name, node name) of the nodes being updated by the timer
+
+
+class ScheduledUpdate(object):
+    """The nodes of a tree to update, and when.
+
+    Args:
+        due: The time.monotonic() at which to update the nodes.
+    """
+
+    def __init__(self, due):
+        self.due = due
+        self.node_names = set()
+
+
+def schedule_update(tree_name, node_name, seconds):
+    """Update a node once no other update has been scheduled in its tree for some time.
+
+    Args:
+        tree_name: The name of the node tree.
+        node_name: The name of the node to update.
+        seconds: The time to wait for further changes.
+    """
+    now = time.monotonic()
+    due = max(now + seconds, _last_updates.get(tree_name, 0.0) + MIN_INTERVAL)
+    update = _scheduled.get(tree_name)
+    if update is None:
+        update = _scheduled[tree_name] = ScheduledUpdate(due)
+    else:
+        update.due = max(update.due, due)
+    update.node_names.add(node_name)
+    if bpy.app.timers.is_registered(run_scheduled_updates):
+        bpy.app.timers.unregister(run_scheduled_updates)
+    bpy.app.timers.register(run_scheduled_updates, first_interval=next_interval(now))
+
+
+def defer_update(node, seconds):
+    """Schedule the evaluation of a node, unless this is the scheduled evaluation.
+
+    Args:
+        node: The node being processed.
+        seconds: The settle time of the node.
+
+    Returns:
+        True if the node must skip this evaluation, as a later one is scheduled.
+    """
+    key = (node.id_data.name, node.name)
+    if key in _released:
+        _released.discard(key)
+        return False
+    job = node_job(node)
+    if job is not None and job.finished and not job.cancelled:
+        return False  # the outputs of the job are being set
+    schedule_update(key[0], key[1], seconds)
+    cancel_job(node)  # its inputs are superseded
+    return True
+
+
+def next_interval(now):
+    """Get the seconds until the next scheduled update, or None if there is none."""
+    if not _scheduled:
+        return None
+    return max(0.0, min(update.due for update in _scheduled.values()) - now)
+
+
+def downstream_node_names(tree, node_names):
+    """Get the names of the nodes which the links of a tree lead to from some nodes."""
+    targets = {}
+    for link in tree.links:
+        targets.setdefault(link.from_node.name, set()).add(link.to_node.name)
+    reached = set()
+    stack = list(node_names)
+    while stack:
+        for name in targets.get(stack.pop(), ()):
+            if name not in reached:
+                reached.add(name)
+                stack.append(name)
+    return reached
+
+
+def run_scheduled_updates():
+    """Update the scheduled nodes of the trees whose update is due.
+
+    All the scheduled nodes of a tree are released first. Only those which are
+    not downstream of another one are updated, as Sverchok then evaluates the
+    others, so each node runs once.
+    """
+    now = time.monotonic()
+    for tree_name, update in list(_scheduled.items()):
+        if update.due > now:
+            continue
+        del _scheduled[tree_name]
+        _last_updates[tree_name] = now
+        tree = bpy.data.node_groups.get(tree_name)
+        if tree is None:
+            continue
+        nodes = [tree.nodes.get(name) for name in update.node_names]
+        nodes = [node for node in nodes if node is not None]
+        for node in nodes:
+            # only nodes which settle consume their release, when processed
+            if getattr(node, 'sv_settle_time', 0) and any(s.is_linked for s in node.outputs):
+                _released.add((tree_name, node.name))
+        downstream = downstream_node_names(tree, [node.name for node in nodes])
+        for node in nodes:
+            if node.name not in downstream:
+                updateNode(node, bpy.context)
+    return next_interval(time.monotonic())
+
+
+def cancel_scheduled_updates(tree_name=None):
+    """Forget the scheduled updates of a tree, or of all trees if tree_name is None."""
+    if tree_name is None:
+        _scheduled.clear()
+    else:
+        _scheduled.pop(tree_name, None)
+
+
+def register():
+    pass
+
+
+def unregister():
+    cancel_scheduled_updates()
+    _last_updates.clear()
+    _released.clear()
+    if bpy.app.timers.is_registered(run_scheduled_updates):
+        bpy.app.timers.unregister(run_scheduled_updates)
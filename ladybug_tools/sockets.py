@@ -5,11 +5,27 @@ from bpy.props import StringProperty
 from sverchok.core.sockets import SvSocketCommon, process_from_socket
 
 
+_summaries = {}  # socket_id: summary of the objectified data set to an output
+
+
 # Monkey-patch!
 def _monkey_get_lenient_socket_types():
     return ['SvLBSocket', 'SvStringsSocket', 'SvObjectSocket', 'SvColorSocket', 'SvVerticesSocket']
 
 
+def data_summary(data, max_depth=4):
+    """Get the ToString of the objectified value at the start of nested output data.
+
+    Only the first item of each level is looked at, so this is cheap for large data.
+    """
+    from .sverchok import Objectifier  # loads NumPy, so not when the add-on starts
+    for _ in range(max_depth):
+        if not isinstance(data, (list, tuple)) or not data:
+            break
+        data = data[0]
+    return data.ToString() if isinstance(data, Objectifier) else ''
+
+
 class SvLBSocketName(bpy.types.Operator):
     bl_idname = "node.sv_lb_socket_name"
     bl_label = "LB Info"
@@ -46,6 +62,18 @@ class SvLBSocket(NodeSocket, SvSocketCommon):
     def default_property(self):
         return self.default_float_property if self.default_property_type == 'float' else self.default_int_property
 
+    def sv_set(self, data):
+        summary = data_summary(data)
+        if summary:
+            _summaries[self.socket_id] = summary
+        else:
+            _summaries.pop(self.socket_id, None)
+        super().sv_set(data)
+
+    def full_tooltip(self):
+        summary = _summaries.get(self.socket_id) if self.is_output else None
+        return '{}\n{}'.format(self.tooltip, summary) if summary else self.tooltip
+
     def draw(self, context, layout, node, text):
         if not self.tooltip:
             self.tooltip = ''
@@ -59,13 +87,13 @@ class SvLBSocket(NodeSocket, SvSocketCommon):
 
         elif self.is_linked:  # linked INPUT or OUTPUT
             layout.operator('node.sv_lb_socket_name',
-                    text=self.get_prop_name()[3:] or self.label or text, emboss=False).tooltip = self.tooltip
+                    text=self.get_prop_name()[3:] or self.label or text, emboss=False).tooltip = self.full_tooltip()
 
 
         elif self.is_output:  # unlinked OUTPUT
             #layout.label(text=self.label or text)
             layout.operator('node.sv_lb_socket_name',
-                    text=self.label or text, emboss=False).tooltip = self.tooltip
+                    text=self.label or text, emboss=False).tooltip = self.full_tooltip()
 
         else:  # unlinked INPUT
             if self.get_prop_name():  # has property
@@ -97,5 +125,6 @@ def register():
     sverchok.core.socket_conversions.DefaultImplicitConversionPolicy.get_lenient_socket_types = _monkey_get_lenient_socket_types
 
 def unregister():
+    _summaries.clear()
     bpy.utils.unregister_class(SvLBSocket)
     bpy.utils.unregister_class(SvLBSocketName)
@@ -0,0 +1,290 @@
+"""A store for results which nodes keep between their evaluations.
+
+This stands for the scriptcontext.sticky dictionary of Grasshopper, where
+components keep expensive results (eg. EPW data, sky matrices or meshes) to
+reuse them when they run again. Component code keeps using it through the
+scriptcontext module, which is installed when the add-on is registered:
+
+    import scriptcontext as sc
+    if 'sky_mtx' not in sc.sticky:
+        sc.sticky['sky_mtx'] = compute_sky_matrix(...)
+
+There, each node evaluated by Blender's main thread gets its own entries.
+Elsewhere, eg. in a background thread, the entries shared by all nodes are
+used, as in Grasshopper. node_sticky(node) gets the entries of a node.
+
+The store is shared by the whole Blender process and limited by a memory
+budget. The least recently used entries past the budget are dropped, or
+written to a directory on disk when spilling is enabled, to be read back when
+they are used again.
+"""
+import collections.abc
+import itertools
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+import types
+
+from .cache import LRUCache
+from .instrument import current_node_key
+
+DEFAULT_BUDGET = 256 * 1024 ** 2
+DEFAULT_SPILL_THRESHOLD = 1024 ** 2
+DOCUMENT = (None, None)  # scope of the entries shared by all nodes, eg. document_counter
+
+
+def entry_size(value):
+    """Estimate the number of bytes held by a value."""
+    import numpy as np  # not when the add-on starts
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class StickyStore(LRUCache):
+    """Values keyed by (node tree name, node name, name), within a memory budget.
+
+    Args:
+        budget: An integer for the maximum number of bytes held in memory.
+        spill: Set to True to write the entries evicted from memory to disk,
+            if they can be pickled and have at least spill_threshold bytes.
+        spill_threshold: An integer for the size in bytes of the smallest
+            entries written to disk. Smaller ones are cheap to compute again.
+    """
+
+    def __init__(self, budget=DEFAULT_BUDGET, spill=False, spill_threshold=DEFAULT_SPILL_THRESHOLD):
+        LRUCache.__init__(self, budget)
+        self.spill = spill
+        self.spill_threshold = spill_threshold
+        self.evictions = 0
+        self.spill_size = 0
+        self._spilled = {}  # key: (path, size)
+        self._spill_dir = None
+        self._spill_names = itertools.count()
+        self._lock = threading.RLock()
+
+    def __contains__(self, key):
+        return key in self._entries or key in self._spilled
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._spilled:
+                value = self._load(key)
+                size = entry_size(value)
+                if size <= self.budget:  # else it stays on disk
+                    self.put(key, value, size)  # which removes the spilled file
+                self.hits += 1
+                return value
+            return LRUCache.get(self, key, default)
+
+    def set(self, key, value):
+        """Store a value, measuring its size.
+
+        A value larger than the whole budget is written to disk when spilling
+        is enabled. Otherwise, it is kept in memory as the only entry, so it
+        can still be read back like in a dictionary.
+        """
+        with self._lock:
+            self._discard_spilled(key)
+            size = entry_size(value)
+            if self.put(key, value, size) or (self.spill and self._dump(key, value)):
+                return
+            self._entries[key] = (value, size)
+            self.size += size
+            self.evict()
+
+    def evict(self):
+        """Drop or spill the least recently used values until the cache fits its budget.
+
+        The most recent value is always kept, even if it is larger than the budget.
+        """
+        while self.size > self.budget and len(self._entries) > 1:
+            key, (value, size) = self._entries.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+            if self.spill and size >= self.spill_threshold:
+                self._dump(key, value)
+
+    def discard(self, key):
+        with self._lock:
+            LRUCache.discard(self, key)
+            self._discard_spilled(key)
+
+    def discard_scope(self, tree_name, node_name=None):
+        """Forget the entries of a node, or of all the nodes of a tree if node_name is None."""
+        with self._lock:
+            for key in [k for k in list(self._entries) + list(self._spilled)
+                        if k[0] == tree_name and (node_name is None or k[1] == node_name)]:
+                self.discard(key)
+
+    def clear(self):
+        with self._lock:
+            LRUCache.clear(self)
+            self._spilled.clear()
+            self.spill_size = 0
+            if self._spill_dir is not None:
+                shutil.rmtree(self._spill_dir, ignore_errors=True)
+                self._spill_dir = None
+
+    def stats(self):
+        """Get a dictionary of the usage of the store."""
+        return {
+            'entries': len(self._entries),
+            'size': self.size,
+            'budget': self.budget,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'spilled_entries': len(self._spilled),
+            'spilled_size': self.spill_size
+        }
+
+    def _dump(self, key, value):
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix='ladybug_sticky_')
+        import numpy as np
+        path = os.path.join(self._spill_dir, '{}.spill'.format(next(self._spill_names)))
+        try:
+            with open(path, 'wb') as f:
+                if isinstance(value, np.ndarray) and value.dtype != object:
+                    f.write(b'N')
+                    np.save(f, value, allow_pickle=False)
+                else:
+                    f.write(b'P')
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:  # values that can't be pickled are dropped
+            if os.path.exists(path):
+                os.remove(path)
+            return False
+        size = os.path.getsize(path)
+        self._spilled[key] = (path, size)
+        self.spill_size += size
+        return True
+
+    def _load(self, key):
+        import numpy as np
+        path, size = self._spilled[key]
+        with open(path, 'rb') as f:
+            return np.load(f) if f.read(1) == b'N' else pickle.load(f)
+
+    def _discard_spilled(self, key):
+        entry = self._spilled.pop(key, None)
+        if entry is not None:
+            self.spill_size -= entry[1]
+            if os.path.exists(entry[0]):
+                os.remove(entry[0])
+
+
+class Sticky(collections.abc.MutableMapping):
+    """The entries of one node in the store, used like scriptcontext.sticky.
+
+    Args:
+        store: The StickyStore.
+        scope: A (node tree name, node name) tuple, or DOCUMENT.
+    """
+
+    def __init__(self, store, scope):
+        self.store = store
+        self.scope = scope
+
+    def _key(self, name):
+        return self.scope + (name,)
+
+    def _keys(self):
+        return [key for key in list(self.store._entries) + list(self.store._spilled)
+                if key[:2] == self.scope]
+
+    def __getitem__(self, name):
+        value = self.store.get(self._key(name), _MISSING)
+        if value is _MISSING:
+            raise KeyError(name)
+        return value
+
+    def __setitem__(self, name, value):
+        self.store.set(self._key(name), value)
+
+    def __delitem__(self, name):
+        if self._key(name) not in self.store:
+            raise KeyError(name)
+        self.store.discard(self._key(name))
+
+    def __contains__(self, name):
+        return self._key(name) in self.store
+
+    def __iter__(self):
+        return iter([key[2] for key in self._keys()])
+
+    def __len__(self):
+        return len(self._keys())
+
+
+class CurrentSticky(Sticky):
+    """The entries of the node evaluated by this thread, or the shared ones if none is."""
+
+    def __init__(self, store):
+        self.store = store
+
+    @property
+    def scope(self):
+        key = current_node_key()
+        return DOCUMENT if key is None else key
+
+
+_MISSING = object()
+store = StickyStore()
+
+# Stand-in for Grasshopper's scriptcontext module, for the code of components
+scriptcontext = types.ModuleType('scriptcontext')
+scriptcontext.sticky = CurrentSticky(store)
+
+
+def configure(budget=None, spill=None, spill_threshold=None):
+    """Change the settings of the store, evicting the entries past a smaller budget.
+
+    Args:
+        budget: An integer for the maximum number of bytes held in memory.
+        spill: Set to True to write evicted entries to disk.
+        spill_threshold: An integer for the size in bytes of the smallest
+            entries written to disk.
+    """
+    with store._lock:
+        if spill is not None:
+            store.spill = spill
+        if spill_threshold is not None:
+            store.spill_threshold = spill_threshold
+        if budget is not None:
+            store.budget = budget
+            store.evict()
+
+
+def node_sticky(node):
+    """Get the entries of a node in the store."""
+    return Sticky(store, (node.id_data.name, node.name))
+
+
+def document_sticky():
+    """Get the entries shared by all nodes in the store."""
+    return Sticky(store, DOCUMENT)
+
+
+def discard_node_sticky(node):
+    """Forget the entries of a node."""
+    store.discard_scope(node.id_data.name, node.name)
+
+
+def register():
+    sys.modules.setdefault('scriptcontext', scriptcontext)
+
+
+def unregister():
+    if sys.modules.get('scriptcontext') is scriptcontext:
+        del sys.modules['scriptcontext']
+    store.clear()
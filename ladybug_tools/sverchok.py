@@ -1,24 +1,14 @@
 """Functions for dealing with inputs and outputs from Grasshopper components."""
 import collections
 import multiprocessing
-import types
+import numbers
+import sys
+import threading
 
-# Stub for .net tasks.
+import numpy as np
 
-def for_each(iterable, fn):
-    for i in iterable:
-        fn(i)
-    return # Does this work in Sverchok?
-
-    pool = multiprocessing.Pool()
-    pool.map(fn, iterable)
-    pool.close()
-    pool.join()
-
-tasks = types.SimpleNamespace()
-Parallel = types.SimpleNamespace()
-Parallel.ForEach = for_each
-tasks.Parallel = Parallel
+Branch = collections.namedtuple('Branch', 'path list')
+TreePattern = collections.namedtuple('TreePattern', 'offsets is_branch')
 
 
 def give_warning(component, message):
@@ -130,44 +120,31 @@ def run_function_in_parallel(parallel_function, object_count, cpu_count=None):
     """Run any function in parallel given a number of objects to be iterated over.
 
     This method can run the calculation in a manner that targets a given CPU
-    count and will also run the function normally (without the use of Tasks)
-    if only one CPU is specified.
+    count and will also run the function normally (without the use of workers)
+    if only one CPU is specified. The workers are kept between calls.
 
     Args:
         parallel_function: A function which will be iterated over in a parallelized
             manner. This function should have a single input argument, which
-            is the integer of the object to be simulated. Note that, in order
-            for this function to be successfully parallelized, any lists of
-            output data must be set up beforehand and this parallel_function
-            should simply be replacing the data in this pre-created list.
+            is the integer of the object to be simulated. Functions which can be
+            pickled, like those at the top of a module, run in worker processes
+            and must return their results. Other functions, like nested functions
+            replacing the data in a list created beforehand, run in worker threads.
         object_count: An integer for the number of objects which will be iterated over
             in a parallelized manner.
         cpu_count: An integer for the number of CPUs to be used in the intersection
             calculation. The ladybug_rhino.grasshopper.recommended_processor_count
             function can be used to get a recommendation. If set to None, all
             available processors will be used. (Default: None).
-    """
-
-    def compute_each_object_group(worker_i):
-        """Run groups of objects so that only the cpu_count is used."""
-        start_i, stop_i = obj_groups[worker_i]
-        for count in range(start_i, stop_i):
-            parallel_function(count)
-
-    if cpu_count is not None and cpu_count > 1:
-        # group the objects in order to meet the cpu_count
-        worker_count = min((cpu_count, object_count))
-        i_per_group = int(math.ceil(object_count / worker_count))
-        obj_groups = [[x, x + i_per_group] for x in range(0, object_count, i_per_group)]
-        obj_groups[-1][-1] = object_count  # ensure the last group ends with obj count
 
+    Returns:
+        A list with the value returned by parallel_function for each object. An
+        exception raised by parallel_function is raised again here.
+    """
+    from .parallel import map_indices  # parallel imports this module
     if cpu_count is None:  # use all availabe CPUs
-        tasks.Parallel.ForEach(range(object_count), parallel_function)
-    elif cpu_count <= 1:  # run everything on a single processor
-        for i in range(object_count):
-            parallel_function(i)
-    else:  # run the groups in a manner that meets the CPU count
-        tasks.Parallel.ForEach(range(len(obj_groups)), compute_each_object_group)
+        cpu_count = local_processor_count()
+    return map_indices(parallel_function, object_count, cpu_count)
 
 
 def component_guid(component):
@@ -241,6 +218,110 @@ def wrap_output(output):
         raise ValueError('Failed to wrap {}:\n{}.'.format(output, e))
 
 
+class Objectifier(object):
+    """Named data that is output as a single object.
+
+    The data is kept as it is given. Homogeneous numbers (eg. hourly values,
+    matrices or grid results) can also be read as a NumPy array through the
+    array property, which is built on first use and kept. If the array holds
+    exactly the same values, it is what gets pickled for the worker processes.
+
+    Args:
+        name: Text for the name of the object.
+        data: The data, as a list or an array.
+    """
+
+    __slots__ = ('name', 'data', '_array', '_exact')
+
+    def __init__(self, name, data):
+        self.name = name
+        self.data = data
+        self._array = _NOT_BUILT
+        self._exact = None
+
+    def _numeric_array(self):
+        if self._array is _NOT_BUILT:
+            self._array = numeric_array(self.data)
+        return self._array
+
+    @property
+    def array(self):
+        """A read-only view of the data array, or None if the data is not numeric."""
+        array = self._numeric_array()
+        if array is None:
+            return None
+        view = array.view()
+        view.flags.writeable = False
+        return view
+
+    def __len__(self):
+        return len(self.data)
+
+    def __reduce__(self):
+        if self._exact is None:
+            array = self._numeric_array()
+            self._exact = not isinstance(self.data, np.ndarray) and array is not None \
+                and same_values(self.data, array)
+        if self._exact:
+            return _objectifier_from_array, (self.name, self._array)
+        return Objectifier, (self.name, self.data)
+
+    def ToString(self):
+        array = self.data if isinstance(self.data, np.ndarray) else self._array
+        if array is not _NOT_BUILT and array is not None:  # only if there is one already
+            return '{} ({} {})'.format(
+                self.name, ' x '.join(str(n) for n in array.shape), array.dtype)
+        return '{} ({} items)'.format(self.name, len(self.data))
+
+    __repr__ = ToString
+
+
+_NOT_BUILT = object()  # array of an Objectifier before it is first needed
+
+
+def _objectifier_from_array(name, array):
+    objectifier = Objectifier(name, array.tolist())
+    objectifier._array = array
+    objectifier._exact = True
+    return objectifier
+
+
+def same_values(data, array):
+    """Check that nested lists hold the same values, of the same types, as array.tolist()."""
+    value_type = {'b': bool, 'i': int, 'f': float}.get(array.dtype.kind)
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if type(value) is list:
+            stack.extend(value)
+        elif type(value) is not value_type:
+            return False  # eg. a tuple, or an int among floats
+    return True
+
+
+def numeric_array(data):
+    """Get the array of a list of numbers, or of lists of numbers with one shape.
+
+    Returns:
+        The array, or None if the data is not such a list. Arrays of numbers are
+        returned without copies.
+    """
+    if isinstance(data, np.ndarray):
+        return data if data.dtype.kind in 'biuf' else None
+    if not isinstance(data, (list, tuple)) or not data:
+        return None
+    first = data[0]
+    while isinstance(first, (list, tuple)) and first:
+        first = first[0]
+    if not isinstance(first, numbers.Number):  # eg. ladybug points, which are sequences
+        return None
+    try:
+        array = np.asarray(data)
+    except (ValueError, TypeError):  # lists of different lengths
+        return None
+    return array if array.dtype.kind in 'biuf' else None
+
+
 def objectify_output(object_name, output_data):
     """Wrap data into a single custom Python object that can later be de-serialized.
 
@@ -257,16 +338,6 @@ def objectify_output(object_name, output_data):
         output_data: A list of data to be stored under the data property of
             the output object.
     """
-    class Objectifier(object):
-        """Generic class for objectifying data."""
-
-        def __init__(self, name, data):
-            self.name = name
-            self.data = data
-
-        def ToString(self):
-            return '{} ({} items)'.format(self.name, len(self.data))
-
     return Objectifier(object_name, output_data)
 
 
@@ -280,18 +351,36 @@ def de_objectify_output(objectified_data):
     return objectified_data.data
 
 
+def de_objectify_array(objectified_data):
+    """Get a read-only NumPy view of the data of an object from objectify_output.
+
+    Unlike de_objectify_output, this does not copy numeric data to lists.
+
+    Args:
+        objectified_data: An object that has been output from the objectify_output
+            method for which data will be returned.
+
+    Returns:
+        The array, or None if the data is not numeric.
+    """
+    return objectified_data.array
+
+
 def document_counter(counter_name):
     """Get an integer for a counter name that advances each time this function is called.
 
+    Counters are shared by all nodes and kept in the sticky store.
+
     Args:
         counter_name: The name of the counter that will be advanced.
     """
-    return "TODO"
+    from .sticky import document_sticky  # sticky needs Blender, unlike this module
+    sticky = document_sticky()
     try:  # get the counter and advance it one value
-        scriptcontext.sticky[counter_name] += 1
+        sticky[counter_name] += 1
     except KeyError:  # first time that the counter is called
-        scriptcontext.sticky[counter_name] = 1
-    return scriptcontext.sticky[counter_name]
+        sticky[counter_name] = 1
+    return sticky[counter_name]
 
 
 def longest_list(values, index):
@@ -310,131 +399,241 @@ def longest_list(values, index):
         return values[-1]
 
 
-def data_tree_to_list(input):
-    """Convert a grasshopper DataTree to nested lists of lists.
+def as_array(values):
+    """Get a NumPy array of values, numeric if possible, without copying arrays.
+
+    Values which are not numbers (eg. ladybug geometry) are held in an object array.
+    """
+    array = numeric_array(values)
+    if array is not None:
+        return array
+    if isinstance(values, np.ndarray):
+        return values
+    array = np.empty(len(values), dtype=object)
+    for i, value in enumerate(values):  # the values may be sequences, like points
+        array[i] = value
+    return array
+
+
+def match_longest_list(*values):
+    """Align lists of values with Grasshopper's longest-list logic, using NumPy.
+
+    This lets a node work on whole aligned arrays, eg. 8760 hourly values and
+    a list of sun vectors, instead of pulling values one index at a time with
+    longest_list.
 
     Args:
-        input: A Grasshopper DataTree.
+        *values: Lists or arrays of values. The shorter ones are extended to
+            the length of the longest by repeating their last value. Rows of
+            2D arrays, like the xyz of vectors, count as one value.
 
     Returns:
-        listData -- A list of namedtuples (path, dataList)
+        A tuple with an array of the aligned values of each argument. Arrays
+        which are already as long as the longest, or have one value, are not
+        copied. The latter are read-only broadcast views.
     """
-    return input
-    all_data = list(range(len(input.Paths)))
-    pattern = collections.namedtuple('Pattern', 'path list')
+    arrays = [as_array(value) for value in values]
+    if not arrays:
+        return ()
+    if any(len(array) == 0 for array in arrays):
+        raise ValueError('Lists of values can not be matched when one of them is empty.')
+    count = max(len(array) for array in arrays)
+    matched = []
+    for array in arrays:
+        if len(array) == 1:
+            array = np.broadcast_to(array, (count,) + array.shape[1:])
+        elif len(array) < count:
+            tail = np.broadcast_to(array[-1:], (count - len(array),) + array.shape[1:])
+            array = np.concatenate((array, tail))
+        matched.append(array)
+    return tuple(matched)
+
+
+def _is_branch(item):
+    return isinstance(item, (list, tuple))
+
 
-    for i, path in enumerate(input.Paths):
-        data = input.Branch(path)
-        branch = pattern(path, [])
+def data_tree_to_list(input):
+    """Convert nested lists to a list of their branches.
 
-        for d in data:
-            if d is not None:
-                branch.list.append(d)
+    As in a Grasshopper DataTree, the branches are the lists holding values,
+    and their path is the index of each list among the lists of its parent.
 
-        all_data[i] = branch
+    Args:
+        input: Nested lists.
 
+    Returns:
+        listData -- A list of namedtuples (path, dataList)
+    """
+    all_data = []
+    stack = [((), input)]
+    while stack:
+        path, branch = stack.pop()
+        values, children = [], []
+        for d in branch:
+            if _is_branch(d):
+                children.append(d)
+            elif d is not None:
+                values.append(d)
+        if values or not children:
+            all_data.append(Branch(path, values))
+        for i in reversed(range(len(children))):
+            stack.append((path + (i,), children[i]))
     return all_data
 
 
 def list_to_data_tree(input, root_count=0, s_type=object):
-    """Transform nested of lists or tuples to a Grasshopper DataTree.
+    """Transform nested of lists or tuples to the nested lists of Sverchok outputs.
 
     Args:
         input: A nested list of lists to be converted into a data tree.
-        root_count: An integer for the starting path of the data tree.
+        root_count: An integer for the starting path of the data tree. Nested
+            lists have no paths, so this is only kept for compatibility.
         s_type: An optional data type (eg. float, int, str) that defines all of the
-            data in the data tree. The default (object) works will all data types
-            but the conversion to data trees can be more efficient if a more
-            specific type is specified.
+            data in the data tree. Lists can hold any type, so this is only
+            kept for compatibility.
     """
-    return input
-
-    def proc(input, tree, track):
-        for i, item in enumerate(input):
-            if isinstance(item, (list, tuple, array.array)):  # ignore iterables like str
-                track.append(i)
-                proc(item, tree, track)
-                track.pop()
+    if input is None:
+        return None
+    tree = []
+    stack = [(input, tree)]
+    while stack:
+        source, target = stack.pop()
+        for item in source:
+            if _is_branch(item):
+                branch = []
+                target.append(branch)
+                stack.append((item, branch))
             else:
-                tree.Add(item, Path(*track))
+                target.append(item)
+    return tree
 
-    if input is not None:
-        t = DataTree[s_type]()
-        proc(input, t, [root_count])
-        return t
+
+def _merge_into(tree, d_tree):
+    """Merge nested lists into the lists of a tree, position by position.
+
+    The n-th list of a source list is merged into the n-th list of the target.
+    Other items are placed after the values of the target which follow the
+    previous item, so merging into an empty tree gives a copy of the source.
+    """
+    stack = [(tree, d_tree)]
+    while stack:
+        target, source = stack.pop()
+        branches = [i for i, item in enumerate(target) if isinstance(item, list)]
+        merged = []
+        index = position = 0
+        for item in source:
+            if _is_branch(item) and index < len(branches):
+                end = branches[index] + 1
+                merged.extend(target[position:end])
+                stack.append((target[end - 1], item))
+                index += 1
+                position = end
+                continue
+            while position < len(target) and not isinstance(target[position], list):
+                merged.append(target[position])  # the values of the target go first
+                position += 1
+            merged.append(list_to_data_tree(item) if _is_branch(item) else item)
+        merged.extend(target[position:])
+        target[:] = merged
 
 
 def merge_data_tree(data_trees, s_type=object):
-    """Merge a list of grasshopper DataTrees into a single DataTree.
+    """Merge a list of data trees into a single one.
+
+    Like with Grasshopper DataTrees, the values of branches with the same path
+    are joined into one branch, in the order of the data trees. The values of a
+    list stay in their place among its lists, so merging a single tree gives a
+    copy of it.
 
     Args:
-        input: A list Grasshopper DataTrees to be merged into one.
+        input: A list of nested lists to be merged into one.
         s_type: An optional data type (eg. float, int, str) that defines all of the
-            data in the data tree. The default (object) works will all data types
-            but the conversion to data trees can be more efficient if a more
-            specific type is specified.
+            data in the data tree. Lists can hold any type, so this is only
+            kept for compatibility.
     """
-    return data_trees
-    comb_tree = DataTree[s_type]()
+    tree = []
     for d_tree in data_trees:
-        for p, branch in zip(d_tree.Paths, d_tree.Branches):
-            comb_tree.AddRange(branch, p)
-    return comb_tree
+        _merge_into(tree, d_tree)
+    return tree
 
 
 def flatten_data_tree(input):
-    """Flatten and clean a grasshopper DataTree into a single list and a pattern.
+    """Flatten and clean nested lists into a single list and a pattern.
+
+    The lists are walked iteratively, so that deep trees can't reach the
+    recursion limit. None values are removed.
 
     Args:
-        input: A Grasshopper DataTree.
+        input: Nested lists.
 
     Returns:
         A tuple with two elements
 
-        -   all_data -- All data in DataTree as a flattened list.
+        -   all_data -- All data in the nested lists as a flattened list. This
+            can be converted to a NumPy array, eg. with numpy.asarray.
 
-        -   pattern -- A dictionary of patterns as namedtuple(path, index of last item
-            on this path, path Count). Pattern is useful to un-flatten the list
-            back to a DataTree.
+        -   pattern -- A TreePattern of NumPy arrays: for each list in the order
+            they are met, offsets has the index of its first item in is_branch,
+            which tells whether each item is a list. Pattern is useful to
+            un-flatten the list back to nested lists.
     """
-    return input
-    Pattern = collections.namedtuple('Pattern', 'path index count')
-    pattern = dict()
     all_data = []
-    index = 0  # Global counter for all the data
-    for i, path in enumerate(input.Paths):
-        count = 0
-        data = input.Branch(path)
-
-        for d in data:
-            if d is not None:
-                count += 1
-                index += 1
-                all_data.append(d)
-
-        pattern[i] = Pattern(path, index, count)
-
+    offsets = []
+    is_branch = []
+    stack = []
+
+    def add_branch(branch):
+        items = [d for d in branch if d is not None]
+        offsets.append(len(is_branch))
+        is_branch.extend(_is_branch(d) for d in items)
+        stack.append(iter(items))
+
+    add_branch(input)
+    while stack:
+        for d in stack[-1]:
+            if _is_branch(d):
+                add_branch(d)
+                break
+            all_data.append(d)
+        else:
+            stack.pop()
+    offsets.append(len(is_branch))
+    pattern = TreePattern(np.array(offsets, dtype=np.int64), np.array(is_branch, dtype=bool))
     return all_data, pattern
 
 
 def unflatten_to_data_tree(all_data, pattern):
-    """Create DataTree from a single flattened list and a pattern.
+    """Create nested lists from a single flattened list and a pattern.
 
     Args:
-        all_data: A flattened list of all data
-        pattern: A dictionary of patterns
-            Pattern = namedtuple('Pattern', 'path index count')
+        all_data: A flattened list of all data, or a NumPy array whose items
+            (or rows) are the data.
+        pattern: A TreePattern from flatten_data_tree.
 
     Returns:
-        data_tree -- A Grasshopper DataTree.
+        data_tree -- Nested lists.
     """
-    return all_data
-    data_tree = DataTree[Object]()
-    for branch in range(len(pattern)):
-        path, index, count = pattern[branch]
-        data_tree.AddRange(all_data[index - count:index], path)
-
-    return data_tree
+    if isinstance(all_data, np.ndarray):
+        all_data = all_data.tolist()
+    offsets = pattern.offsets.tolist()
+    is_branch = pattern.is_branch.tolist()
+    data = iter(all_data)
+    tree = []
+    next_branch = 1
+    stack = [(tree, offsets[0], offsets[1])]
+    while stack:
+        target, start, stop = stack.pop()
+        for i in range(start, stop):
+            if is_branch[i]:
+                branch = []
+                target.append(branch)
+                stack.append((target, i + 1, stop))
+                stack.append((branch, offsets[next_branch], offsets[next_branch + 1]))
+                next_branch += 1
+                break
+            target.append(next(data))
+    return tree
 
 
 def recipe_result(result):
@@ -473,14 +672,25 @@ def show_output(component, output_index):
 
 
 def schedule_solution(component, milliseconds):
-    """Schedule a new Grasshopper solution after a specified time interval.
+    """Schedule a new evaluation of a node after a specified time interval.
+
+    Scheduling again before the time has passed postpones the evaluation, so
+    that rapid changes lead to a single update of the node tree.
 
     Args:
-        component: The grasshopper component object, which can be accessed through
-            the ghenv.Component call within Grasshopper API.
+        component: The node to evaluate again. If None, the node being evaluated
+            by Blender's main thread is used. Nothing is scheduled from other
+            threads or worker processes.
         milliseconds: Integer for the number of milliseconds after which the
             solution should happen.
     """
-    return
-    doc = component.OnPingDocument()
-    doc.ScheduleSolution(milliseconds)
+    if 'bpy' not in sys.modules or threading.current_thread() is not threading.main_thread():
+        return  # timers can only be used by Blender's main thread
+    from .instrument import current_node_key  # these need Blender, unlike this module
+    from .schedule import schedule_update
+    if component is not None:
+        key = (component.id_data.name, component.name)
+    else:
+        key = current_node_key()
+    if key is not None:
+        schedule_update(key[0], key[1], milliseconds / 1000.0)
@@ -0,0 +1,390 @@
+"""Static analysis of Grasshopper component code for the node generator."""
+import ast
+
+ALWAYS = None  # consumer of statements whose side effects must always run
+# Modules which change Blender data, so they must only be used by its main thread
+BLENDER_MODULES = ('bpy', 'bmesh', 'mathutils', 'ladybug_tools.togeometry', 'ladybug_tools.intersect')
+# Builtins which neither mutate their arguments nor return them
+PURE_FUNCTIONS = frozenset((
+    'abs', 'all', 'any', 'bool', 'dict', 'enumerate', 'float', 'int', 'isinstance', 'len',
+    'list', 'max', 'min', 'range', 'reversed', 'round', 'set', 'sorted', 'str', 'sum',
+    'tuple', 'zip'))
+
+
+def root_name(node):
+    """Get the name at the root of an attribute or subscript chain, if any."""
+    while isinstance(node, (ast.Attribute, ast.Subscript)):
+        node = node.value
+    return node.id if isinstance(node, ast.Name) else None
+
+
+def walk_outside_comprehensions(node, bound=frozenset()):
+    """Like ast.walk, but skip the names bound by the comprehensions they are in."""
+    if isinstance(node, ast.Name) and node.id in bound:
+        return
+    yield node
+    if isinstance(node, (ast.ListComp, ast.SetComp, ast.GeneratorExp, ast.DictComp)):
+        bound = bound | {n.id for g in node.generators for n in ast.walk(g.target)
+                         if isinstance(n, ast.Name)}
+    for child in ast.iter_child_nodes(node):
+        yield from walk_outside_comprehensions(child, bound)
+
+
+def call_effects(call, module_names=frozenset()):
+    """Get the names a call might mutate: the object of a method and the arguments.
+
+    Names of modules (eg. math in math.sqrt(x)) are not data, so they are left out.
+    """
+    if isinstance(call.func, ast.Name) and call.func.id in PURE_FUNCTIONS:
+        return set()
+    names = set()
+    if isinstance(call.func, ast.Attribute):
+        names.add(root_name(call.func.value))
+    for arg in call.args + [keyword.value for keyword in call.keywords]:
+        if isinstance(arg, ast.Starred):
+            arg = arg.value
+        names.add(root_name(arg))
+    names.discard(None)
+    return names - module_names
+
+
+def assignments(tree, module_names=frozenset()):
+    """Yield the target names and the source names of each assignment in a tree.
+
+    These are the targets of assignments and for loops, including unpacked ones
+    (eg. x, y = a, 2), and every name in the assigned value, eg. in a = b.c,
+    a = [b] or a = b.setdefault(k, []). Names of the functions called are left
+    out.
+    """
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign):
+            targets, value = node.targets, node.value
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets, value = [node.target], node.value
+        elif isinstance(node, (ast.For, ast.comprehension)):
+            targets, value = [node.target], node.iter
+        else:
+            continue
+        functions = {id(n.func) for n in ast.walk(value) if isinstance(n, ast.Call)}
+        sources = {n.id for n in ast.walk(value)
+                   if isinstance(n, ast.Name) and id(n) not in functions} - module_names
+        yield {n.id for t in targets for n in ast.walk(t) if isinstance(n, ast.Name)}, sources
+
+
+def alias_names(tree, module_names=frozenset()):
+    """Get the names that may refer to the same object as another name.
+
+    These are the targets and sources of the assignments with a source.
+    Mutating one of these names might change the value of another one.
+    """
+    aliases = set()
+    for targets, sources in assignments(tree, module_names):
+        if sources:
+            aliases.update(sources)
+            aliases.update(targets)
+    return aliases
+
+
+def statement_effects(statement, aliases=frozenset(), module_names=frozenset()):
+    """Get the names a statement defines and uses, and whether it is pure.
+
+    Any call of a method of a name (eg. values.pop(0)) or with a name as an
+    argument, and assigning to an item or attribute of a name, count as defining
+    that name, unless the name is one of the aliases. So does an augmented
+    assignment to a name (eg. a += [1]), which may change its object in place.
+    Any other bare call, import, return, raise or delete is a side effect, so it
+    is not pure.
+    """
+    defs, mutated, uses, pure = set(), set(), set(), True
+    for node in walk_outside_comprehensions(statement):
+        if isinstance(node, ast.Name):
+            if isinstance(node.ctx, ast.Store):
+                defs.add(node.id)
+            elif isinstance(node.ctx, ast.Del):
+                pure = False
+            else:
+                uses.add(node.id)
+        elif isinstance(node, (ast.Attribute, ast.Subscript)) and isinstance(node.ctx, ast.Store):
+            mutated.add(root_name(node))
+        elif isinstance(node, ast.AugAssign) and isinstance(node.target, ast.Name):
+            mutated.add(node.target.id)  # eg. a += [1] extends the list in place
+            uses.add(node.target.id)
+        elif isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            defs.add(node.name)
+        elif isinstance(node, ast.Call):
+            mutated.update(call_effects(node, module_names))
+        elif isinstance(node, ast.Expr) and isinstance(node.value, ast.Call):
+            func = node.value.func
+            if not isinstance(func, ast.Attribute) or root_name(func.value) is None \
+                    or root_name(func.value) in module_names:
+                pure = False  # eg. print(x) or os.remove(x)
+        elif isinstance(node, (ast.Import, ast.ImportFrom, ast.Return, ast.Raise,
+                               ast.Global, ast.Nonlocal, ast.Delete, ast.Assert)):
+            pure = False
+    mutated.discard(None)
+    if mutated & aliases:
+        pure = False
+    return defs | mutated, uses, pure
+
+
+def copy_needs(needs):
+    return {name: set(consumers) for name, consumers in needs.items()}
+
+
+def slice_block(statements, needs, feeds_by_statement, aliases, module_names=frozenset()):
+    """Find the consumers fed by each statement of a block, walking it backwards.
+
+    Args:
+        statements: A list of ast statements.
+        needs: A dictionary from names to the set of outputs (or ALWAYS) that
+            consume the value of the name after the block. It is updated to
+            the needs before the block.
+        feeds_by_statement: A dictionary to be filled with the consumers of
+            each statement that is not an if statement.
+        aliases: A set of names which always have side effects when mutated.
+        module_names: A set of the names bound by the imports of the code.
+
+    Returns:
+        The set of consumers fed by any statement of the block.
+    """
+    block_feeds = set()
+    for statement in reversed(statements):
+        if isinstance(statement, ast.If):
+            body_needs, else_needs = copy_needs(needs), copy_needs(needs)
+            feeds = slice_block(statement.body, body_needs, feeds_by_statement, aliases, module_names) | \
+                slice_block(statement.orelse, else_needs, feeds_by_statement, aliases, module_names)
+            for branch_needs in (body_needs, else_needs):
+                for name, consumers in branch_needs.items():
+                    needs.setdefault(name, set()).update(consumers)
+            uses = statement_effects(ast.Expr(statement.test))[1]
+        else:
+            defs, uses, pure = statement_effects(statement, aliases, module_names)
+            feeds = set()
+            for name in defs:
+                feeds.update(needs.get(name, ()))
+            if not pure:
+                feeds.add(ALWAYS)
+            feeds_by_statement[statement] = feeds
+        for name in uses:
+            needs.setdefault(name, set()).update(feeds)
+        block_feeds |= feeds
+    return block_feeds
+
+
+def is_line_safe(statement, lines):
+    """Check that a statement can be re-indented line by line."""
+    for node in ast.walk(statement):
+        if isinstance(node, ast.Constant) and isinstance(node.value, str) \
+                and node.lineno != node.end_lineno:
+            return False  # re-indenting would change a multi-line string
+    # the statement must not share its first or last line with another one
+    before = lines[statement.lineno - 1][:statement.col_offset]
+    after = lines[statement.end_lineno - 1][statement.end_col_offset:]
+    return not before.strip() and (not after.strip() or after.strip().startswith('#'))
+
+
+def guard_groups(statements, feeds_by_statement, all_outputs, lines, groups):
+    """Collect runs of statements that only feed the same subset of outputs."""
+    run, run_feeds = [], None
+    for statement in statements + [None]:
+        feeds = None
+        if statement is not None and not isinstance(statement, ast.If):
+            feeds = frozenset(feeds_by_statement[statement])
+            if not feeds or ALWAYS in feeds or feeds == all_outputs \
+                    or not is_line_safe(statement, lines):
+                feeds = None
+        if run and feeds != run_feeds:
+            groups.append((run, run_feeds))
+            run = []
+        if feeds is not None:
+            run.append(statement)
+            run_feeds = feeds
+        if isinstance(statement, ast.If):
+            guard_groups(statement.body, feeds_by_statement, all_outputs, lines, groups)
+            guard_groups(statement.orelse, feeds_by_statement, all_outputs, lines, groups)
+
+
+def guard_unlinked_outputs(code, output_names, linked_name='sv_linked', module_names=()):
+    """Wrap the statements that only compute some outputs in a check that they are linked.
+
+    Args:
+        code: Text for the Python code of a Grasshopper component.
+        output_names: A list of the names of the component outputs.
+        linked_name: The name of the set of linked output names, which must be
+            defined before the code runs.
+        module_names: The names bound by imports which were split from the
+            code. Calls of their functions (eg. math.sqrt) don't mutate them.
+
+    Returns:
+        The guarded code. This is the input code if it could not be analyzed.
+    """
+    if '\t' in code:
+        return code
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return code  # eg. IronPython 2 only syntax
+    needs = {name: {name} for name in output_names}
+    # Functions can run later than the statements defining the names they use
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.Lambda, ast.ClassDef)):
+            for child in ast.walk(node):
+                if isinstance(child, ast.Name):
+                    needs.setdefault(child.id, set()).add(ALWAYS)
+    module_names = frozenset(module_names) | {
+        name for node in ast.walk(tree) if isinstance(node, (ast.Import, ast.ImportFrom))
+        for name in (imported_names(node) or ())}
+    feeds_by_statement = {}
+    slice_block(tree.body, needs, feeds_by_statement, alias_names(tree, module_names), module_names)
+
+    lines = code.split('\n')
+    groups = []
+    guard_groups(tree.body, feeds_by_statement, frozenset(output_names), lines, groups)
+    for statements, feeds in sorted(groups, key=lambda g: g[0][0].lineno, reverse=True):
+        start, end = statements[0].lineno - 1, statements[-1].end_lineno
+        indent = ' ' * statements[0].col_offset
+        condition = ' or '.join("'{}' in {}".format(name, linked_name) for name in sorted(feeds))
+        lines[start:end] = ['{}if {}:'.format(indent, condition)] + \
+            ['    ' + line if line.strip() else line for line in lines[start:end]]
+    return '\n'.join(lines)
+
+
+def imported_names(statement):
+    """Get the names bound by an import statement, or None for a star import."""
+    names = []
+    for alias in statement.names:
+        if alias.name == '*':
+            return None
+        if alias.asname:
+            names.append(alias.asname)
+        elif isinstance(statement, ast.Import):
+            names.append(alias.name.split('.')[0])
+        else:
+            names.append(alias.name)
+    return names
+
+
+def import_block_names(statement):
+    """Get the names bound by an import statement, or by a try statement of imports
+    which only re-raises errors (eg. with a better message). None for anything else."""
+    if isinstance(statement, (ast.Import, ast.ImportFrom)):
+        return imported_names(statement)
+    if not isinstance(statement, ast.Try) or statement.orelse or statement.finalbody \
+            or not all(len(h.body) == 1 and isinstance(h.body[0], ast.Raise)
+                       for h in statement.handlers):
+        return None
+    names = []
+    for child in statement.body:
+        if not isinstance(child, (ast.Import, ast.ImportFrom)):
+            return None
+        child_names = imported_names(child)
+        if child_names is None:
+            return None
+        names.extend(child_names)
+    return names
+
+
+def imported_modules(tree):
+    """Get the names of the modules imported anywhere in a parsed code."""
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules.add(node.module)
+            # eg. from ladybug_tools import togeometry
+            modules.update('{}.{}'.format(node.module, alias.name) for alias in node.names)
+    return modules
+
+
+def uses_blender(code):
+    """Check whether the code of a Grasshopper component may use Blender data.
+
+    This is the case if it imports one of the BLENDER_MODULES, or could not be analyzed.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return True
+    return any(module == name or module.startswith(name + '.')
+               for module in imported_modules(tree) for name in BLENDER_MODULES)
+
+
+def mutated_inputs(code, input_names):
+    """Get the inputs whose values the code of a Grasshopper component may change in place.
+
+    These are the inputs whose items or attributes are assigned or deleted,
+    which are augmented (eg. _values += [0]), or which are the object or an
+    argument of a call, or which share a name changed this way through
+    assignments (eg. x = [_values] and x[0].append(0)).
+
+    Returns:
+        A list of the names of these inputs. This is all of them if the code
+        could not be analyzed.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return list(input_names)
+    module_names = frozenset(
+        name for node in ast.walk(tree) if isinstance(node, (ast.Import, ast.ImportFrom))
+        for name in (imported_names(node) or ()))
+    mutated = set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Attribute, ast.Subscript)) and \
+                isinstance(node.ctx, (ast.Store, ast.Del)):
+            mutated.add(root_name(node))
+        elif isinstance(node, ast.AugAssign) and isinstance(node.target, ast.Name):
+            mutated.add(node.target.id)
+        elif isinstance(node, ast.Call):
+            mutated.update(call_effects(node, module_names))
+    # the names connected by assignments may share their objects
+    groups = {}
+    for targets, sources in assignments(tree, module_names):
+        group = set(targets) | sources
+        for name in list(group):
+            group |= groups.get(name, set())
+        for name in group:
+            groups[name] = group
+    return [name for name in input_names if groups.get(name, {name}) & mutated]
+
+
+def split_imports(code, reserved_names=()):
+    """Split the import statements at the start of the code of a Grasshopper component.
+
+    Args:
+        code: Text for the Python code of a Grasshopper component.
+        reserved_names: Names the imports must not bind, eg. the inputs.
+
+    Returns:
+        A tuple with the code of the imports, a list of the names they bind, and
+        the rest of the code. The imports are empty if the code has none at its
+        start or could not be analyzed.
+    """
+    if '\t' in code:
+        return '', [], code
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return '', [], code  # eg. IronPython 2 only syntax
+    lines = code.split('\n')
+    statements, names = [], []
+    for statement in tree.body:
+        statement_names = import_block_names(statement)
+        if statement_names is None or set(statement_names) & set(reserved_names) \
+                or not is_line_safe(statement, lines):
+            break
+        statements.append(statement)
+        names.extend(statement_names)
+    if not statements:
+        return '', [], code
+    import_lines = []
+    for statement in reversed(statements):
+        start, end = statement.lineno - 1, statement.end_lineno
+        import_lines[:0] = lines[start:end]
+        while end < len(lines) and not lines[end].strip():
+            end += 1  # and the blank lines after it
+        del lines[start:end]
+    indent = min(len(line) - len(line.lstrip()) for line in import_lines if line.strip())
+    imports = '\n'.join(line[indent:] for line in import_lines)
+    return imports, list(dict.fromkeys(names)), '\n'.join(lines)
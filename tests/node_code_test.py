@@ -0,0 +1,39 @@
+"""Test the analysis of component code in node_code."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from node_code import guard_unlinked_outputs, mutated_inputs  # noqa: E402
+
+
+def run_guarded(code, output_names, linked):
+    """Run code guarded for its unlinked outputs and get the values of the outputs."""
+    namespace = {'sv_linked': frozenset(linked)}
+    exec(guard_unlinked_outputs(code, output_names), namespace)
+    return {name: namespace.get(name) for name in linked}
+
+
+def test_alias_in_list_display():
+    code = 'a = []\nb = [a]\nb[0].append(1)\nn = len(b)\nout1 = a\nout2 = n'
+    assert run_guarded(code, ['out1', 'out2'], ['out1']) == {'out1': [1]}
+
+
+def test_alias_in_tuple_unpacking():
+    code = 'a = []\nx, y = a, 2\nx.append(1)\nn = y\nout1 = a\nout2 = n'
+    assert run_guarded(code, ['out1', 'out2'], ['out1']) == {'out1': [1]}
+
+
+def test_augmented_assignment_of_alias():
+    code = 'a = []\nother = a\nother += [1]\nn = len(other)\nout1 = a\nout2 = n'
+    assert run_guarded(code, ['out1', 'out2'], ['out1']) == {'out1': [1]}
+
+
+def test_unlinked_output_skipped():
+    code = 'vals = [1, 2]\nfirst = vals.pop(0)\nout1 = vals\nout2 = first * 2'
+    guarded = guard_unlinked_outputs(code, ['out1', 'out2'])
+    assert "if 'out2' in sv_linked:" in guarded
+
+
+def test_mutated_inputs():
+    code = 'x = [_values]\ny = x\ny[0].append(1)\nn = len(_count)\nout = sum(_other)'
+    assert mutated_inputs(code, ['_values', '_count', '_other']) == ['_values']